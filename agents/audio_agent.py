@@ -3,17 +3,40 @@ Audio Agent - Adds background music and sound effects to videos
 """
 
 import logging
-import random
 import asyncio
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from pydub import AudioSegment
-from pydub.generators import Sine, Square, Sawtooth, WhiteNoise
-from pydub.effects import normalize, compress_dynamic_range
 import numpy as np
+from scipy import signal
 
 from config.settings import settings
 
+# Intermediate WAVs written once per video; their names carry the video's name
+TEMP_AUDIO_STEMS = ("enhanced_voice", "voice_placeholder", "combined_advanced", "combined_simple")
+
+# Bump when the music synthesis changes so cached renders are regenerated
+MUSIC_RENDER_VERSION = 4
+
+# Chromatic scale used for chord interval math
+NOTE_NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+
+@lru_cache(maxsize=16)
+def _decode_pcm(path: str, mtime_ns: int, size: int, sample_rate: int) -> np.ndarray:
+    """Decode an audio file to mono int16 samples (re-decoded when mtime or size change)"""
+    segment = AudioSegment.from_file(path)
+    segment = segment.set_channels(1).set_sample_width(2).set_frame_rate(sample_rate)
+    return np.frombuffer(segment.raw_data, dtype=np.int16)
+
 class AudioAgent:
     """Adds audio to videos with sophisticated music generation"""
     
@@ -22,6 +45,13 @@ class AudioAgent:
         self.settings = settings
         self.music_dir = Path(self.settings.background_music_dir)
         self.sounds_dir = Path(self.settings.sounds_dir)
+        self.sample_rate = self.settings.audio_sample_rate
+        
+        # Samples of files written by this agent, keyed by path
+        self._pcm_cache: Dict[str, np.ndarray] = {}
+        
+        # Worker threads for the blocking synthesis steps
+        self._executor: Optional[ThreadPoolExecutor] = None
         
         # Music style definitions
         self.music_styles = {
@@ -61,6 +91,20 @@ class AudioAgent:
             "E": 329.63, "F": 349.23, "F#": 369.99, "G": 392.00,
             "G#": 415.30, "A": 440.00, "A#": 466.16, "B": 493.88
         }
+        
+        # Impulse response for the reverb: 0.5s of exponentially decaying noise,
+        # scaled to unit energy so the wet signal stays at the dry level
+        ir_length = int(0.5 * self.sample_rate)
+        decay = np.exp(-6.0 * np.arange(ir_length) / ir_length)
+        impulse = np.random.default_rng(0).standard_normal(ir_length) * decay
+        self._reverb_ir = (impulse / np.sqrt(np.sum(impulse ** 2))).astype(np.float32)
+        
+        # Chord frequencies for every chord used by the styles
+        self._chord_freq_cache = {
+            chord: self._compute_chord_notes(chord)
+            for style_config in self.music_styles.values()
+            for chord in style_config["chords"]
+        }
     
     async def initialize(self):
         """Initialize audio agent"""
@@ -68,8 +112,10 @@ class AudioAgent:
             self.music_dir.mkdir(exist_ok=True, parents=True)
             self.sounds_dir.mkdir(exist_ok=True, parents=True)
             
-            # Create some sample music files if they don't exist
-            await self._create_sample_music()
+            # Create some sample music files if they don't exist. add_audio renders
+            # its own track, so this is opt-in to keep start-up fast.
+            if self.settings.generate_samples_on_init:
+                await self._create_sample_music()
             
             self.logger.info("✅ Audio Agent initialized!")
             
@@ -77,23 +123,25 @@ class AudioAgent:
             self.logger.error(f"❌ Failed to initialize Audio Agent: {e}")
             raise
     
-    async def add_audio(self, video_path: str, script: str, music_style: str = "upbeat_cute") -> str:
-        """Add audio to video with enhanced music generation"""
+    async def add_audio(self, video_path: str, script: str, music_style: str = "upbeat_cute",
+                        name: Optional[str] = None) -> str:
+        """Add audio to video with enhanced music generation; name (e.g. the content ID) keeps its files apart"""
+        # Several videos can get their audio at once, so the per-video files are named after the video
+        name = name or Path(video_path).stem
+        
         try:
             self.logger.info(f"🎵 Adding audio with style: {music_style}")
             
-            # Generate sophisticated music
-            music_path = await self._create_advanced_music(music_style, duration=15)
-            
-            # Create voice-over with better timing
-            voice_path = await self._create_enhanced_voice(script)
-            
-            # Add sound effects
-            effects_path = await self._add_sound_effects(music_style)
+            # Music, voice-over and sound effects are independent, so render them concurrently
+            music_path, voice_path, effects_path = await asyncio.gather(
+                self._create_advanced_music(music_style, duration=15),
+                self._create_enhanced_voice(script, name),
+                self._add_sound_effects(music_style)
+            )
             
             # Combine all audio elements
             combined_audio = await self._combine_audio_advanced(
-                music_path, voice_path, effects_path
+                music_path, voice_path, effects_path, name
             )
             
             # Merge with video
@@ -106,221 +154,352 @@ class AudioAgent:
             self.logger.error(f"❌ Error adding audio: {e}")
             # Return original video if audio processing fails
             return video_path
+        
+        finally:
+            # The intermediate tracks are only needed for this video
+            for stem in TEMP_AUDIO_STEMS:
+                temp_path = self._temp_path(stem, name)
+                self._pcm_cache.pop(str(temp_path), None)
+                try:
+                    temp_path.unlink()
+                except FileNotFoundError:
+                    pass
+    
+    async def _run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run CPU-bound synthesis on the agent's worker threads"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=3)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
     
     async def _create_advanced_music(self, style: str, duration: int = 15) -> str:
         """Create sophisticated music with multiple layers"""
+        return await self._run_blocking(self._render_advanced_music, style, duration)
+    
+    def _render_advanced_music(self, style: str, duration: int) -> str:
+        """Render layered music to a WAV file (blocking)"""
         try:
             style_config = self.music_styles.get(style, self.music_styles["upbeat_cute"])
             
+            # Reuse a previous render of the same style and duration
+            output_path = self._music_path(style, duration)
+            if output_path.exists():
+                return str(output_path)
+            
+            # Draw every layer from this render's own generator, in a fixed order
+            rng = self._render_rng("music", style, duration)
+            
             # Generate melody
-            melody = await self._generate_melody(style_config, duration)
+            melody = self._generate_melody(style_config, duration, rng)
             
             # Generate harmony
-            harmony = await self._generate_harmony(style_config, duration)
+            harmony = self._generate_harmony(style_config, duration, rng)
             
             # Generate rhythm
-            rhythm = await self._generate_rhythm(style_config, duration)
+            rhythm = self._generate_rhythm(style_config, duration, rng)
             
             # Combine layers
-            combined = await self._mix_music_layers(melody, harmony, rhythm, style_config)
+            combined = self._mix_music_layers(melody, harmony, rhythm, style_config)
             
             # Apply effects
-            final_music = await self._apply_music_effects(combined, style_config)
+            final_music = self._apply_music_effects(combined, style_config)
             
             # Export
-            output_path = self.music_dir / f"music_{style}_{duration}s.wav"
-            final_music.export(str(output_path), format="wav")
+            self._write_wav(final_music, output_path)
             
             return str(output_path)
             
         except Exception as e:
             self.logger.error(f"Error creating advanced music: {e}")
             # Fallback to simple music
-            return await self._create_simple_music(style)
+            return self._render_simple_music(style)
+    
+    def _render_rng(self, *key_parts: Any) -> np.random.Generator:
+        """Random generator for one render, private to its worker thread and reproducible from AUDIO_SEED"""
+        if self.settings.audio_seed is None:
+            return np.random.default_rng()
+        key = json.dumps(key_parts, sort_keys=True, default=str)
+        digest = int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'little')
+        return np.random.default_rng([self.settings.audio_seed, digest])
     
-    async def _generate_melody(self, style_config: Dict[str, Any], duration: int) -> AudioSegment:
+    def _generate_melody(self, style_config: Dict[str, Any], duration: int,
+                         rng: np.random.Generator) -> np.ndarray:
         """Generate melodic line"""
         scale = style_config["scale"]
         tempo = style_config["tempo"]
         beats_per_second = tempo / 60
         
-        melody = AudioSegment.empty()
-        current_time = 0
+        # Random note durations (0.5 to 2 seconds), drawn in one batch
+        note_durations = self._draw_durations(0.5, 2.0, duration, rng)
+        durations_ms = (note_durations * 1000).astype(int)
+        count = note_durations.size
         
-        while current_time < duration:
-            # Choose random note from scale
-            note = random.choice(scale)
-            freq = self.note_frequencies.get(note, 440)
-            
-            # Random note duration (0.5 to 2 seconds)
-            note_duration = random.uniform(0.5, 2.0)
-            note_duration = min(note_duration, duration - current_time)
-            
-            # Generate note with slight variation
-            note_audio = Sine(freq).to_audio_segment(duration=int(note_duration * 1000))
-            
-            # Add some variation to make it more interesting
-            if random.random() < 0.3:
-                note_audio = note_audio + random.uniform(-3, 3)
-            
-            melody += note_audio
-            current_time += note_duration
+        # Choose random notes from scale
+        scale_freqs = [self.note_frequencies.get(note, 440) for note in scale]
+        freqs = rng.choice(scale_freqs, size=count)
+        
+        # Add some variation to make it more interesting
+        gains_db = np.where(rng.random(count) < 0.3,
+                            rng.uniform(-3, 3, size=count), 0.0)
         
-        return melody
+        # Synthesize the whole melody in one pass
+        return self._synth_wave(freqs, durations_ms, gains_db)
     
-    async def _generate_harmony(self, style_config: Dict[str, Any], duration: int) -> AudioSegment:
+    def _generate_harmony(self, style_config: Dict[str, Any], duration: int,
+                          rng: np.random.Generator) -> np.ndarray:
         """Generate harmonic accompaniment"""
         chords = style_config["chords"]
         tempo = style_config["tempo"]
         
-        harmony = AudioSegment.empty()
-        current_time = 0
+        # Play each random chord for 1-2 seconds
+        chord_durations = self._draw_durations(1.0, 2.0, duration, rng)
+        durations_ms = (chord_durations * 1000).astype(int)
+        chord_names = rng.choice(chords, size=chord_durations.size)
         
-        while current_time < duration:
-            # Choose random chord
-            chord = random.choice(chords)
-            
-            # Generate chord notes
-            chord_notes = self._get_chord_notes(chord)
-            
-            # Play chord for 1-2 seconds
-            chord_duration = random.uniform(1.0, 2.0)
-            chord_duration = min(chord_duration, duration - current_time)
-            
-            chord_audio = AudioSegment.empty()
-            for note in chord_notes:
-                note_audio = Sine(note).to_audio_segment(duration=int(chord_duration * 1000))
-                chord_audio = chord_audio.overlay(note_audio)
-            
-            # Lower volume for harmony
-            chord_audio = chord_audio - 10
-            
-            harmony += chord_audio
-            current_time += chord_duration
+        # Fill a preallocated buffer instead of growing a segment per chord
+        counts = [self._ms_to_samples(ms) for ms in durations_ms]
+        harmony = np.empty(sum(counts), dtype=np.float32)
+        offset = 0
+        
+        # Each note gets a third of full scale, then the chord is lowered by 10 dB
+        chord_scale = 1 / 3 * 10 ** (-10 / 20)
+        
+        for chord, n in zip(chord_names, counts):
+            # Sum all chord notes in a single broadcast expression
+            freqs = np.asarray(self._get_chord_notes(chord))[:, np.newaxis]
+            t = np.arange(n) / self.sample_rate
+            chord_audio = np.sin(2 * np.pi * freqs * t).sum(axis=0)
+            
+            harmony[offset:offset + n] = chord_audio * chord_scale
+            offset += n
         
         return harmony
     
-    async def _generate_rhythm(self, style_config: Dict[str, Any], duration: int) -> AudioSegment:
+    def _generate_rhythm(self, style_config: Dict[str, Any], duration: int,
+                         rng: np.random.Generator) -> np.ndarray:
         """Generate rhythmic elements"""
         tempo = style_config["tempo"]
         beats_per_second = tempo / 60
+        beat_interval = 60 / tempo
         
-        rhythm = AudioSegment.empty()
-        current_time = 0
+        # Render one beat once: kick drum (low frequency) followed by a snare (noise)
+        kick = self._apply_gain(self._synth_wave([60], [100]), 5)  # Boost volume
+        snare = rng.uniform(-1, 1, self._ms_to_samples(50)).astype(np.float32)
+        snare = self._butter_filter(snare, 1000, "highpass")  # High-pass filter
+        snare = self._apply_gain(snare, 3)
+        beat = np.concatenate([kick, snare])
         
-        while current_time < duration:
-            # Generate drum-like sounds
-            if random.random() < 0.4:  # 40% chance of beat
-                # Kick drum (low frequency)
-                kick = Sine(60).to_audio_segment(duration=100)
-                kick = kick + 5  # Boost volume
-                
-                # Snare (noise)
-                snare = WhiteNoise().to_audio_segment(duration=50)
-                snare = snare.high_pass_filter(1000)  # High-pass filter
-                snare = snare + 3
-                
-                beat = kick + snare
-                rhythm += beat
-            
-            # Wait for next beat
-            beat_interval = 60 / tempo
-            current_time += beat_interval
+        # One measure slot per beat interval, with the beat at its start
+        slot_length = max(self._ms_to_samples(beat_interval * 1000), beat.size)
+        measure = np.zeros(slot_length, dtype=np.float32)
+        measure[:beat.size] = beat
         
-        return rhythm
+        # Tile the measure and silence the slots that don't get a beat
+        beat_count = int(np.ceil(duration / beat_interval))
+        hits = rng.random(beat_count) < 0.4  # 40% chance of beat
+        rhythm = np.tile(measure, (beat_count, 1))
+        rhythm[~hits] = 0
+        
+        return rhythm.ravel()
+    
+    def _draw_durations(self, low: float, high: float, total: float,
+                        rng: np.random.Generator) -> np.ndarray:
+        """Draw random lengths in seconds until they cover total, trimming the last one"""
+        max_count = int(np.ceil(total / low))
+        durations = rng.uniform(low, high, size=max_count)
+        starts = np.concatenate([[0.0], np.cumsum(durations)[:-1]])
+        used = starts < total
+        return np.minimum(durations[used], total - starts[used])
     
-    async def _mix_music_layers(self, melody: AudioSegment, harmony: AudioSegment, 
-                               rhythm: AudioSegment, style_config: Dict[str, Any]) -> AudioSegment:
+    def _mix_music_layers(self, melody: np.ndarray, harmony: np.ndarray,
+                          rhythm: np.ndarray, style_config: Dict[str, Any]) -> np.ndarray:
         """Mix different music layers together"""
-        # Ensure all segments have the same length
-        max_length = max(len(melody), len(harmony), len(harmony))
-        
-        if len(melody) < max_length:
-            melody = melody + AudioSegment.silent(duration=max_length - len(melody))
-        if len(harmony) < max_length:
-            harmony = harmony + AudioSegment.silent(duration=max_length - len(harmony))
-        if len(rhythm) < max_length:
-            rhythm = rhythm + AudioSegment.silent(duration=max_length - len(rhythm))
+        # Pad every layer to the longest one
+        max_length = max(melody.size, harmony.size, rhythm.size)
         
-        # Mix layers with appropriate volumes
-        mixed = melody.overlay(harmony)
-        mixed = mixed.overlay(rhythm)
+        # Layers stay in float, so overlapping peaks are left for normalization
+        mixed = np.zeros(max_length, dtype=np.float32)
+        for layer in (melody, harmony, rhythm):
+            mixed[:layer.size] += layer
         
         return mixed
     
-    async def _apply_music_effects(self, music: AudioSegment, style_config: Dict[str, Any]) -> AudioSegment:
+    def _apply_music_effects(self, music: np.ndarray, style_config: Dict[str, Any]) -> np.ndarray:
         """Apply audio effects based on style"""
         try:
             # Normalize audio
-            music = normalize(music)
+            samples = self._normalize(music)
             
             # Apply compression
-            music = compress_dynamic_range(music, threshold=-20, ratio=4)
+            samples = self._compress(samples, threshold_db=-20, ratio=4)
             
             # Apply style-specific effects
+            gain_db = 0
             if style_config["mood"] == "happy":
                 # Brighten the sound
-                music = music.high_pass_filter(200)
-                music = music + 2
+                samples = self._butter_filter(samples, 200, "highpass")
+                gain_db = 2
             elif style_config["mood"] == "peaceful":
                 # Soften the sound
-                music = music.low_pass_filter(8000)
-                music = music - 3
+                samples = self._butter_filter(samples, 8000, "lowpass")
+                samples = self._apply_reverb(samples)
+                gain_db = -3
             elif style_config["mood"] == "energetic":
                 # Boost high frequencies
-                music = music.high_pass_filter(100)
-                music = music + 3
+                samples = self._butter_filter(samples, 100, "highpass")
+                gain_db = 3
             elif style_config["mood"] == "emotional":
                 # Warm sound
-                music = music.low_pass_filter(6000)
-                music = music - 2
+                samples = self._butter_filter(samples, 6000, "lowpass")
+                samples = self._apply_reverb(samples)
+                gain_db = -2
             
-            return music
+            return self._apply_gain(samples, gain_db)
             
         except Exception as e:
             self.logger.warning(f"Could not apply music effects: {e}")
             return music
     
-    def _get_chord_notes(self, chord: str) -> List[float]:
+    def _butter_filter(self, samples: np.ndarray, cutoff: float, btype: str,
+                       order: int = 4) -> np.ndarray:
+        """Apply a Butterworth high/low-pass filter as second-order sections"""
+        sos = signal.butter(order, cutoff, btype=btype, fs=self.sample_rate, output="sos")
+        return signal.sosfilt(sos, samples).astype(samples.dtype)
+    
+    def _apply_reverb(self, samples: np.ndarray, wet: float = 0.3) -> np.ndarray:
+        """Blend in a convolution reverb, using overlap-add FFT convolution"""
+        tail = signal.oaconvolve(samples, self._reverb_ir)[:samples.size]
+        return ((1 - wet) * samples + wet * tail).astype(samples.dtype)
+    
+    def _normalize(self, samples: np.ndarray, headroom_db: float = 0.1) -> np.ndarray:
+        """Scale float samples so the peak sits headroom_db below full scale"""
+        peak = np.abs(samples).max() if samples.size else 0
+        if peak == 0:
+            return samples
+        return samples * (10 ** (-headroom_db / 20) / peak)
+    
+    def _compress(self, samples: np.ndarray, threshold_db: float, ratio: float) -> np.ndarray:
+        """Static compressor: reduce the level above the threshold by ratio"""
+        threshold = 10 ** (threshold_db / 20)
+        magnitude = np.abs(samples)
+        over = np.maximum(magnitude - threshold, 0)
+        return np.where(magnitude > threshold,
+                        np.sign(samples) * (threshold + over / ratio),
+                        samples).astype(samples.dtype)
+    
+    def _cached_path(self, directory: Path, stem: str, *key_parts: Any) -> Path:
+        """Build a cache file path whose name changes with the render inputs"""
+        key = json.dumps([stem, *key_parts], sort_keys=True, default=str)
+        digest = hashlib.md5(key.encode()).hexdigest()[:8]
+        return directory / f"{stem}_{digest}.wav"
+    
+    def _temp_path(self, stem: str, name: str) -> Path:
+        """Path of an intermediate WAV that belongs to one video"""
+        return self.sounds_dir / f"{stem}_{name}.wav"
+    
+    def _write_wav(self, samples: np.ndarray, output_path: Path):
+        """Write mono samples as 16-bit WAV and keep them for in-process mixing"""
+        if samples.dtype.kind == 'f':
+            # Float samples are in [-1, 1]; quantize once, on the way out
+            samples = np.clip(samples * 32767, -32768, 32767)
+        samples = samples.astype(np.int16)
+        
+        # Write under a private name and rename, so a concurrent render that finds the
+        # shared music or effects cache file never reads it half written
+        tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with wave.open(str(tmp_path), 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(samples.tobytes())
+        os.replace(tmp_path, output_path)
+        self._pcm_cache[str(output_path)] = samples
+    
+    def _segment_samples(self, segment: AudioSegment) -> np.ndarray:
+        """Get mono int16 samples at the agent's sample rate from a segment"""
+        segment = segment.set_channels(1).set_sample_width(2).set_frame_rate(self.sample_rate)
+        return np.frombuffer(segment.raw_data, dtype=np.int16)
+    
+    def _load_pcm(self, path: str) -> np.ndarray:
+        """Get mono int16 samples for a WAV, preferring the in-process copy"""
+        samples = self._pcm_cache.get(str(path))
+        if samples is None:
+            stat = os.stat(path)
+            samples = _decode_pcm(str(path), stat.st_mtime_ns, stat.st_size, self.sample_rate)
+        return samples
+    
+    def _music_path(self, style: str, duration: int) -> Path:
+        """Canonical cache path for rendered music of a style and duration"""
+        style_config = self.music_styles.get(style, self.music_styles["upbeat_cute"])
+        return self._cached_path(self.music_dir, f"music_{style}_{duration}s",
+                                 style_config, duration, self.settings.audio_seed,
+                                 MUSIC_RENDER_VERSION)
+    
+    def _ms_to_samples(self, duration_ms: float) -> int:
+        """Convert a duration in milliseconds to a sample count"""
+        return int(self.sample_rate * duration_ms / 1000)
+    
+    def _synth_wave(self, freqs: List[float], durations_ms: List[int],
+                    gains_db: Optional[List[float]] = None) -> np.ndarray:
+        """Synthesize a sequence of sine notes (0 Hz = rest) as float32 samples in one pass"""
+        sr = self.sample_rate
+        counts = [self._ms_to_samples(ms) for ms in durations_ms]
+        
+        # Per-sample frequency, integrated to a continuous phase
+        sample_freqs = np.repeat(np.asarray(freqs, dtype=np.float64), counts)
+        phase = np.cumsum(2 * np.pi * sample_freqs / sr)
+        
+        # A frequency of 0 is a rest
+        tone = np.sin(phase) * (sample_freqs > 0)
+        
+        if gains_db is not None:
+            tone *= np.repeat(10 ** (np.asarray(gains_db, dtype=np.float64) / 20), counts)
+        
+        return tone.astype(np.float32)
+    
+    def _to_segment(self, samples: np.ndarray) -> AudioSegment:
+        """Wrap mono int16 samples in an AudioSegment"""
+        return AudioSegment(samples.astype(np.int16).tobytes(), frame_rate=self.sample_rate,
+                            sample_width=2, channels=1)
+    
+    def _apply_gain(self, samples: np.ndarray, gain_db: float) -> np.ndarray:
+        """Apply a gain in dB to float samples"""
+        return (samples * 10 ** (gain_db / 20)).astype(samples.dtype)
+    
+    def _apply_fades(self, samples: np.ndarray, fade_in_ms: int, fade_out_ms: int) -> np.ndarray:
+        """Apply linear fade-in/fade-out ramps to float samples"""
+        envelope = np.ones(samples.size, dtype=samples.dtype)
+        n_in = min(self._ms_to_samples(fade_in_ms), samples.size)
+        n_out = min(self._ms_to_samples(fade_out_ms), samples.size)
+        envelope[:n_in] = np.linspace(0.0, 1.0, n_in, endpoint=False)
+        if n_out:
+            envelope[-n_out:] *= np.linspace(1.0, 0.0, n_out)
+        return samples * envelope
+    
+    def _get_chord_notes(self, chord: str) -> Tuple[float, float, float]:
         """Get the notes that make up a chord"""
+        return self._chord_freq_cache[chord]
+    
+    def _compute_chord_notes(self, chord: str) -> Tuple[float, float, float]:
+        """Compute root, third and fifth frequencies of a chord"""
         if chord.endswith('m'):  # Minor chord
-            root = chord[:-1]
-            third = self._get_minor_third(root)
-            fifth = self._get_perfect_fifth(root)
+            root, third_interval = chord[:-1], 3
         else:  # Major chord
-            root = chord
-            third = self._get_major_third(root)
-            fifth = self._get_perfect_fifth(root)
-        
-        root_freq = self.note_frequencies.get(root, 440)
-        third_freq = self.note_frequencies.get(third, 554.37)
-        fifth_freq = self.note_frequencies.get(fifth, 659.25)
-        
-        return [root_freq, third_freq, fifth_freq]
-    
-    def _get_major_third(self, note: str) -> str:
-        """Get major third of a note"""
-        notes = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-        note_index = notes.index(note)
-        third_index = (note_index + 4) % 12
-        return notes[third_index]
-    
-    def _get_minor_third(self, note: str) -> str:
-        """Get minor third of a note"""
-        notes = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-        note_index = notes.index(note)
-        third_index = (note_index + 3) % 12
-        return notes[third_index]
-    
-    def _get_perfect_fifth(self, note: str) -> str:
-        """Get perfect fifth of a note"""
-        notes = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-        note_index = notes.index(note)
-        fifth_index = (note_index + 7) % 12
-        return notes[fifth_index]
-    
-    async def _create_enhanced_voice(self, script: str) -> str:
+            root, third_interval = chord, 4
+        
+        root_index = NOTE_NAMES.index(root)
+        root_freq, third_freq, fifth_freq = (
+            self.note_frequencies[NOTE_NAMES[(root_index + interval) % 12]]
+            for interval in (0, third_interval, 7)
+        )
+        return root_freq, third_freq, fifth_freq
+    
+    async def _create_enhanced_voice(self, script: str, name: str) -> str:
         """Create enhanced voice-over with better timing"""
+        return await self._run_blocking(self._render_enhanced_voice, script, name)
+    
+    def _render_enhanced_voice(self, script: str, name: str) -> str:
+        """Render the voice-over placeholder tones to a WAV file (blocking)"""
         try:
             # Estimate words per second (average speaking rate)
             words_per_second = 2.5
@@ -328,59 +507,65 @@ class AudioAgent:
             estimated_duration = word_count / words_per_second
             
             # Create voice placeholder with varying tones
-            voice = AudioSegment.empty()
-            current_time = 0
-            
-            for word in script.split():
-                # Vary the tone slightly for each word
-                base_freq = 800
-                variation = random.uniform(-100, 100)
-                freq = base_freq + variation
-                
-                # Word duration based on word length
-                word_duration = max(0.2, len(word) * 0.1)
-                
-                word_audio = Sine(freq).to_audio_segment(duration=int(word_duration * 1000))
-                voice += word_audio
-                
-                # Small pause between words
-                pause = AudioSegment.silent(duration=50)
-                voice += pause
-                
-                current_time += word_duration + 0.05
+            words = script.split()
+            
+            # Vary the tone slightly for each word
+            base_freq = 800
+            rng = self._render_rng("voice", script)
+            freqs = base_freq + rng.uniform(-100, 100, size=len(words))
+            
+            # Word duration based on word length
+            durations_ms = [int(max(0.2, len(word) * 0.1) * 1000) for word in words]
+            
+            # Small pause between words, encoded as 50ms rests so the whole
+            # voice-over is synthesized from a single phase array
+            rest_freqs = np.zeros(len(freqs))
+            freqs = np.column_stack([freqs, rest_freqs]).ravel()
+            durations_ms = np.column_stack([durations_ms, np.full(len(durations_ms), 50)]).ravel()
+            samples = self._synth_wave(freqs, durations_ms)
             
             # Export voice
-            output_path = self.sounds_dir / "enhanced_voice.wav"
-            voice.export(str(output_path), format="wav")
+            output_path = self._temp_path("enhanced_voice", name)
+            self._write_wav(samples, output_path)
             
             return str(output_path)
             
         except Exception as e:
             self.logger.error(f"Error creating enhanced voice: {e}")
-            return await self._create_voice_placeholder(script)
+            return self._render_voice_placeholder(script, name)
     
     async def _add_sound_effects(self, style: str) -> str:
         """Add appropriate sound effects for the style"""
+        return await self._run_blocking(self._render_sound_effects, style)
+    
+    def _render_sound_effects(self, style: str) -> str:
+        """Render the style's sound effects to a WAV file (blocking)"""
         try:
-            effects = AudioSegment.empty()
-            
             if style == "upbeat_cute":
                 # Add some cute sound effects
-                for i in range(3):
-                    effect = Sine(1200 + i * 200).to_audio_segment(duration=200)
-                    effect = effect.fade_in(50).fade_out(50)
-                    effects += effect + AudioSegment.silent(duration=800)
-            
+                tones = [(1200 + i * 200, 200, 50, 800) for i in range(3)]
             elif style == "calm_peaceful":
                 # Add gentle nature sounds
-                for i in range(2):
-                    effect = Sine(400 + i * 100).to_audio_segment(duration=1000)
-                    effect = effect.fade_in(200).fade_out(200)
-                    effects += effect + AudioSegment.silent(duration=2000)
+                tones = [(400 + i * 100, 1000, 200, 2000) for i in range(2)]
+            else:
+                tones = []
+            
+            output_path = self._cached_path(self.sounds_dir, f"effects_{style}", tones)
+            if output_path.exists():
+                return str(output_path)
+            
+            # Each effect is (frequency, length_ms, fade_ms, trailing_silence_ms)
+            counts = [self._ms_to_samples(ms + silence_ms) for _, ms, _, silence_ms in tones]
+            samples = np.zeros(sum(counts), dtype=np.float32)
+            offset = 0
+            
+            for (freq, ms, fade_ms, _), n in zip(tones, counts):
+                effect = self._apply_fades(self._synth_wave([freq], [ms]), fade_ms, fade_ms)
+                samples[offset:offset + effect.size] = effect
+                offset += n
             
             # Export effects
-            output_path = self.sounds_dir / f"effects_{style}.wav"
-            effects.export(str(output_path), format="wav")
+            self._write_wav(samples, output_path)
             
             return str(output_path)
             
@@ -389,81 +574,82 @@ class AudioAgent:
             return ""
     
     async def _combine_audio_advanced(self, music_path: str, voice_path: str, 
-                                     effects_path: str = "") -> str:
+                                     effects_path: str, name: str) -> str:
         """Combine all audio elements with advanced mixing"""
         try:
-            music = AudioSegment.from_file(music_path)
-            voice = AudioSegment.from_file(voice_path)
+            music = self._load_pcm(music_path) / np.float32(32768)
+            voice = self._load_pcm(voice_path) / np.float32(32768)
             
             # Ensure same length
-            max_length = max(len(music), len(voice))
-            
-            if len(music) < max_length:
-                music = music + AudioSegment.silent(duration=max_length - len(music))
-            if len(voice) < max_length:
-                voice = voice + AudioSegment.silent(duration=max_length - len(voice))
+            max_length = max(music.size, voice.size)
+            music = np.pad(music, (0, max_length - music.size))
+            voice = np.pad(voice, (0, max_length - voice.size))
             
             # Mix with proper levels
-            music = music - 15  # Lower music volume
-            voice = voice + 5   # Boost voice volume
-            
-            combined = music.overlay(voice)
+            combined = music * 10 ** (-15 / 20)  # Lower music volume
+            combined += voice * 10 ** (5 / 20)   # Boost voice volume
             
             # Add effects if available
             if effects_path and Path(effects_path).exists():
                 try:
-                    effects = AudioSegment.from_file(effects_path)
-                    if len(effects) <= max_length:
-                        effects = effects - 8  # Lower effects volume
-                        combined = combined.overlay(effects)
+                    effects = self._load_pcm(effects_path)
+                    if effects.size <= max_length:
+                        # Lower effects volume
+                        combined[:effects.size] += effects / np.float32(32768) * 10 ** (-8 / 20)
                 except Exception as e:
                     self.logger.warning(f"Could not add effects: {e}")
             
-            # Final processing
-            combined = normalize(combined)
+            # Final processing: normalize to 0.1 dB below full scale
+            combined = self._normalize(combined)
             
             # Export
-            output_path = self.sounds_dir / "combined_advanced.wav"
-            combined.export(str(output_path), format="wav")
+            output_path = self._temp_path("combined_advanced", name)
+            self._write_wav(combined, output_path)
             
             return str(output_path)
             
         except Exception as e:
             self.logger.error(f"Error combining audio: {e}")
             # Fallback to simple combination
-            return await self._combine_audio(music_path, voice_path)
+            return await self._combine_audio(music_path, voice_path, name)
     
     async def _create_simple_music(self, style: str) -> str:
         """Create simple synthesized music (fallback)"""
-        output_path = self.music_dir / f"simple_music_{style}.wav"
-        
+        return await self._run_blocking(self._render_simple_music, style)
+    
+    def _render_simple_music(self, style: str) -> str:
+        """Render the simple fallback tune to a WAV file (blocking)"""
         if style == "upbeat_cute":
             notes = [440, 523, 659, 784]  # A, C, E, G
         else:
             notes = [440, 494, 523, 587]  # A, B, C, D
         
-        melody = AudioSegment.empty()
-        for note in notes:
-            tone = Sine(note).to_audio_segment(duration=500)
-            melody += tone
+        output_path = self._cached_path(self.music_dir, f"simple_music_{style}", notes)
+        if output_path.exists():
+            return str(output_path)
         
-        melody.export(str(output_path), format="wav")
+        melody = self._synth_wave(notes, [500] * len(notes))
+        self._write_wav(melody, output_path)
         return str(output_path)
     
-    async def _create_voice_placeholder(self, script: str) -> str:
+    async def _create_voice_placeholder(self, script: str, name: str) -> str:
         """Create placeholder for voice-over (fallback)"""
-        output_path = self.sounds_dir / "voice_placeholder.wav"
+        return await self._run_blocking(self._render_voice_placeholder, script, name)
+    
+    def _render_voice_placeholder(self, script: str, name: str) -> str:
+        """Render the voice-over beep to a WAV file (blocking)"""
+        output_path = self._temp_path("voice_placeholder", name)
         
         # Simple beep for timing
-        voice = Sine(800).to_audio_segment(duration=len(script.split()) * 200)
-        voice.export(str(output_path), format="wav")
+        voice = self._synth_wave([800], [len(script.split()) * 200])
+        self._write_wav(voice, output_path)
         
         return str(output_path)
     
-    async def _combine_audio(self, music_path: str, voice_path: str) -> str:
+    async def _combine_audio(self, music_path: str, voice_path: str, name: str) -> str:
         """Combine music and voice (fallback)"""
-        music = AudioSegment.from_file(music_path)
-        voice = AudioSegment.from_file(voice_path)
+        music = self._to_segment(self._load_pcm(music_path))
+        voice = self._to_segment(self._load_pcm(voice_path))
         
         # Adjust volumes
         music = music - 15
@@ -471,36 +657,72 @@ class AudioAgent:
         
         combined = music.overlay(voice)
         
-        output_path = self.sounds_dir / "combined_simple.wav"
-        combined.export(str(output_path), format="wav")
+        output_path = self._temp_path("combined_simple", name)
+        self._write_wav(self._segment_samples(combined), output_path)
         
         return str(output_path)
     
     async def _merge_audio_video(self, video_path: str, audio_path: str) -> str:
         """Merge audio with video"""
+        output_path = Path(video_path).parent / f"final_{Path(video_path).name}"
+        
+        if shutil.which("ffmpeg"):
+            try:
+                # Only the audio changes, so stream-copy the video instead of re-encoding it.
+                # The audio is looped and cut to the video length like the MoviePy path.
+                ffmpeg_cmd = [
+                    'ffmpeg', '-y',  # Overwrite output
+                    '-i', video_path,
+                    '-stream_loop', '-1', '-i', audio_path,
+                    '-map', '0:v:0', '-map', '1:a:0',
+                    '-c:v', 'copy',
+                    '-c:a', 'aac', '-b:a', '192k',
+                    '-shortest',
+                    str(output_path)
+                ]
+                
+                result = await self._run_blocking(
+                    partial(subprocess.run, ffmpeg_cmd, capture_output=True, text=True)
+                )
+                
+                if result.returncode == 0:
+                    return str(output_path)
+                
+                self.logger.warning(f"FFmpeg merge failed, falling back to MoviePy: {result.stderr}")
+                
+            except Exception as e:
+                self.logger.warning(f"FFmpeg merge failed, falling back to MoviePy: {e}")
+        
+        return await self._merge_audio_video_moviepy(video_path, audio_path, output_path)
+    
+    async def _merge_audio_video_moviepy(self, video_path: str, audio_path: str,
+                                         output_path: Path) -> str:
+        """Merge audio with video by re-encoding through MoviePy (fallback)"""
         try:
-            from moviepy.editor import VideoFileClip, AudioFileClip
+            from moviepy.editor import VideoFileClip, AudioFileClip, afx
             
             video = VideoFileClip(video_path)
             audio = AudioFileClip(audio_path)
             
             # Ensure audio matches video duration
-            if len(audio) > len(video):
-                audio = audio.subclip(0, len(video))
-            elif len(audio) < len(video):
+            if audio.duration > video.duration:
+                audio = audio.subclip(0, video.duration)
+            elif audio.duration < video.duration:
                 # Loop audio if it's shorter
-                audio = audio.loop(duration=len(video))
+                audio = afx.audio_loop(audio, duration=video.duration)
             
             # Merge audio and video
             final_video = video.set_audio(audio)
             
             # Export
-            output_path = Path(video_path).parent / f"final_{Path(video_path).name}"
             final_video.write_videofile(
                 str(output_path),
                 codec='libx264',
                 audio_codec='aac',
-                temp_audiofile='temp-audio.m4a',
+                preset='ultrafast',  # Encode speed matters more than size for shorts
+                threads=os.cpu_count(),
+                ffmpeg_params=['-crf', '23', '-tune', 'fastdecode'],
+                temp_audiofile=str(output_path.with_suffix('.temp-audio.m4a')),
                 remove_temp=True
             )
             
@@ -522,7 +744,7 @@ class AudioAgent:
         """Create sample music files for testing"""
         try:
             for style in self.music_styles.keys():
-                sample_path = self.music_dir / f"sample_{style}.wav"
+                sample_path = self._music_path(style, duration=10)
                 if not sample_path.exists():
                     await self._create_advanced_music(style, duration=10)
                     self.logger.info(f"Created sample music: {style}")
@@ -532,18 +754,17 @@ class AudioAgent:
     async def cleanup(self):
         """Cleanup resources"""
         try:
-            # Clean up temporary files
-            temp_files = [
-                self.sounds_dir / "combined_advanced.wav",
-                self.sounds_dir / "combined_simple.wav",
-                self.sounds_dir / "enhanced_voice.wav",
-                self.sounds_dir / "voice_placeholder.wav"
-            ]
-            
-            for temp_file in temp_files:
-                if temp_file.exists():
+            # Clean up temporary files left behind by interrupted videos
+            for stem in TEMP_AUDIO_STEMS:
+                for temp_file in self.sounds_dir.glob(f"{stem}_*.wav"):
                     temp_file.unlink()
-                    
+            
+            self._pcm_cache.clear()
+            
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            
             self.logger.info("✅ Audio Agent cleanup completed")
             
         except Exception as e:
@@ -6,10 +6,11 @@ Generates creative video ideas and scripts using open-source AI models
 import asyncio
 import logging
 import random
+import re
+from functools import partial
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 
-from transformers import pipeline
 from config.settings import settings
 
 class ContentAgent:
@@ -27,6 +28,16 @@ class ContentAgent:
         self.idea_templates = self._load_idea_templates()
         self.script_templates = self._load_script_templates()
         
+        # Template lookup tables and precompiled placeholder patterns
+        self._idea_by_category = {t['category']: t for t in self.idea_templates}
+        self._script_by_type = {t['type']: t for t in self.script_templates}
+        for template in self.idea_templates + self.script_templates:
+            template['_pattern'] = re.compile(
+                r"\{(" + "|".join(map(re.escape, template['variables'])) + r")\}"
+            )
+            template['_var_names'] = tuple(template['variables'])
+            template['_var_lists'] = tuple(template['variables'].values())
+        
         # Animal categories
         self.animal_categories = [
             "puppies", "kittens", "baby_animals", "exotic_pets",
@@ -38,13 +49,18 @@ class ContentAgent:
         try:
             self.logger.info("🤖 Initializing Content Agent...")
             
-            # Initialize text generation model
+            # transformers is heavy, so import it only when the model is loaded
+            from transformers import pipeline
+            
+            # Initialize text generation model off the event loop, so other agents can load meanwhile
             model_name = "microsoft/DialoGPT-medium"
-            self.text_generator = pipeline(
+            loop = asyncio.get_running_loop()
+            self.text_generator = await loop.run_in_executor(None, partial(
+                pipeline,
                 "text-generation",
                 model=model_name,
                 device=self.settings.model_device
-            )
+            ))
             
             self.logger.info("✅ Content Agent initialized!")
             
@@ -93,41 +109,37 @@ class ContentAgent:
         try:
             self.logger.info(f"💡 Generating {count} video ideas")
             
-            ideas = []
-            for i in range(count):
-                idea = self._generate_template_idea(theme)
-                script = await self._generate_script(idea)
-                
-                idea_data = {
-                    'id': f"idea_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{i}",
-                    'title': idea['title'],
-                    'description': idea['description'],
-                    'category': idea['category'],
-                    'theme': theme,
-                    'script': script,
-                    'optimal_time': datetime.now() + timedelta(hours=i*2),
-                    'estimated_duration': self.settings.video_duration,
-                    'tags': [theme, 'animals', 'cute', 'viral'],
-                    'created_at': datetime.now().isoformat()
-                }
-                
-                ideas.append(idea_data)
+            # Ideas are independent, so build them concurrently
+            ideas = await asyncio.gather(*[self._make_idea(i, theme) for i in range(count)])
             
-            return ideas
+            return list(ideas)
             
         except Exception as e:
             self.logger.error(f"❌ Error generating ideas: {e}")
             return self._generate_fallback_ideas(count, theme)
     
+    async def _make_idea(self, index: int, theme: str) -> Dict[str, Any]:
+        """Generate one idea with its script"""
+        idea = self._generate_template_idea(theme)
+        script = await self._generate_script(idea)
+        
+        return {
+            'id': f"idea_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{index}",
+            'title': idea['title'],
+            'description': idea['description'],
+            'category': idea['category'],
+            'theme': theme,
+            'script': script,
+            'optimal_time': datetime.now() + timedelta(hours=index*2),
+            'estimated_duration': self.settings.video_duration,
+            'tags': [theme, 'animals', 'cute', 'viral'],
+            'created_at': datetime.now().isoformat()
+        }
+    
     def _generate_template_idea(self, theme: str) -> Dict[str, Any]:
         """Generate idea using templates"""
-        template = next((t for t in self.idea_templates if t['category'] == theme), 
-                       self.idea_templates[0])
-        
-        title = template['template']
-        for var_name, var_values in template['variables'].items():
-            value = random.choice(var_values)
-            title = title.replace(f"{{{var_name}}}", value)
+        template = self._idea_by_category.get(theme, self.idea_templates[0])
+        title = self._fill_template(template)
         
         description = f"A delightful video featuring {title.lower()}. Perfect for animal lovers!"
         
@@ -141,17 +153,17 @@ class ContentAgent:
     async def _generate_script(self, idea: Dict[str, Any]) -> str:
         """Generate script for the video"""
         script_type = self._get_script_type(idea['category'])
-        template = next((t for t in self.script_templates if t['type'] == script_type), 
-                      self.script_templates[0])
-        
-        script = template['template']
-        for var_name, var_values in template['variables'].items():
-            value = random.choice(var_values)
-            script = script.replace(f"{{{var_name}}}", value)
+        template = self._script_by_type.get(script_type, self.script_templates[0])
+        script = self._fill_template(template)
         
         script += "\n\nDon't forget to like and share! 🐾"
         return script
     
+    def _fill_template(self, template: Dict[str, Any]) -> str:
+        """Fill a template's placeholders in one pass, one random value per variable"""
+        values = dict(zip(template['_var_names'], map(random.choice, template['_var_lists'])))
+        return template['_pattern'].sub(lambda m: values[m.group(1)], template['template'])
+    
     def _get_script_type(self, category: str) -> str:
         """Determine script type"""
         if "funny" in category:
@@ -5,6 +5,8 @@ Handles uploading videos to multiple social media platforms
 
 import asyncio
 import logging
+from collections import deque
+from functools import partial
 from typing import Dict, Any, List
 from datetime import datetime
 import os
@@ -23,8 +25,9 @@ class UploadAgent:
         self.instagram_client = None
         self.tiktok_client = None
         
-        # Upload status tracking
-        self.upload_history = []
+        # Upload status tracking (only the last 100 uploads are kept)
+        self.upload_history = deque(maxlen=100)
+        self._upload_index: Dict[str, Dict[str, Any]] = {}
     
     async def initialize(self):
         """Initialize platform clients"""
@@ -116,34 +119,24 @@ class UploadAgent:
         try:
             self.logger.info(f"📤 Uploading to all platforms: {content['title']}")
             
-            results = {}
-            
-            # Upload to YouTube
+            # Uploads are independent, so run them concurrently
+            uploads = {}
             if self.settings.is_youtube_enabled:
-                try:
-                    youtube_result = await self._upload_to_youtube(content)
-                    results['youtube'] = youtube_result
-                except Exception as e:
-                    self.logger.error(f"❌ YouTube upload failed: {e}")
-                    results['youtube'] = {'success': False, 'error': str(e)}
-            
-            # Upload to Instagram
+                uploads['youtube'] = self._upload_to_youtube(content)
             if self.settings.is_instagram_enabled:
-                try:
-                    instagram_result = await self._upload_to_instagram(content)
-                    results['instagram'] = instagram_result
-                except Exception as e:
-                    self.logger.error(f"❌ Instagram upload failed: {e}")
-                    results['instagram'] = {'success': False, 'error': str(e)}
-            
-            # Upload to TikTok
+                uploads['instagram'] = self._upload_to_instagram(content)
             if self.settings.is_tiktok_enabled:
-                try:
-                    tiktok_result = await self._upload_to_tiktok(content)
-                    results['tiktok'] = tiktok_result
-                except Exception as e:
-                    self.logger.error(f"❌ TikTok upload failed: {e}")
-                    results['tiktok'] = {'success': False, 'error': str(e)}
+                uploads['tiktok'] = self._upload_to_tiktok(content)
+            
+            outcomes = await asyncio.gather(*uploads.values(), return_exceptions=True)
+            
+            results = {}
+            for platform, outcome in zip(uploads, outcomes):
+                if isinstance(outcome, Exception):
+                    self.logger.error(f"❌ Upload to {platform} failed: {outcome}")
+                    results[platform] = {'success': False, 'error': str(outcome)}
+                else:
+                    results[platform] = outcome
             
             # Record upload
             self._record_upload(content, results)
@@ -174,10 +167,15 @@ class UploadAgent:
                 }
             }
             
-            # Upload video
+            from googleapiclient.errors import HttpError
+            from googleapiclient.http import MediaFileUpload
+            
+            # Upload video; the file is read one chunk at a time, so memory use
+            # is bounded by the chunk size rather than the video size
             media = MediaFileUpload(
                 content['video_path'],
                 mimetype='video/mp4',
+                chunksize=self.settings.upload_chunk_size,
                 resumable=True
             )
             
@@ -187,7 +185,24 @@ class UploadAgent:
                 media_body=media
             )
             
-            response = request.execute()
+            # Send the video in chunks; each blocking chunk runs off the event loop
+            loop = asyncio.get_running_loop()
+            response = None
+            retries = 0
+            while response is None:
+                try:
+                    status, response = await loop.run_in_executor(None, request.next_chunk)
+                    retries = 0
+                    if status:
+                        self.logger.debug(f"YouTube upload progress: {int(status.progress() * 100)}%")
+                except HttpError as e:
+                    # Retry transient server errors; the upload resumes from the last chunk
+                    if e.resp.status not in (500, 502, 503, 504) or retries >= 5:
+                        raise
+                    retries += 1
+                    delay = 2 ** retries
+                    self.logger.warning(f"⚠️ YouTube upload error {e.resp.status}, retrying in {delay}s")
+                    await asyncio.sleep(delay)
             
             return {
                 'success': True,
@@ -206,8 +221,10 @@ class UploadAgent:
             if not self.instagram_client:
                 raise Exception("Instagram client not initialized")
             
-            # Instagram Reels upload
-            result = self.instagram_client.post_video(
+            # Instagram Reels upload (blocking client, run off the event loop)
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, partial(
+                self.instagram_client.post_video,
                 video_path=content['video_path'],
                 caption=content['description'],
                 extra_data={
@@ -215,7 +232,7 @@ class UploadAgent:
                     'like_and_view_counts_disabled': False,
                     'disable_comments': False
                 }
-            )
+            ))
             
             return {
                 'success': True,
@@ -255,22 +272,22 @@ class UploadAgent:
             'video_path': content['video_path']
         }
         
-        self.upload_history.append(upload_record)
+        # Drop the record about to be evicted from the index, unless a newer upload replaced it
+        if len(self.upload_history) == self.upload_history.maxlen:
+            oldest = self.upload_history[0]
+            if self._upload_index.get(oldest['content_id']) is oldest:
+                del self._upload_index[oldest['content_id']]
         
-        # Keep only last 100 uploads
-        if len(self.upload_history) > 100:
-            self.upload_history = self.upload_history[-100:]
+        self.upload_history.append(upload_record)
+        self._upload_index[content['id']] = upload_record
     
     async def get_upload_status(self, content_id: str) -> Dict[str, Any]:
         """Get upload status for specific content"""
-        for record in self.upload_history:
-            if record['content_id'] == content_id:
-                return record
-        return {'error': 'Content not found'}
+        return self._upload_index.get(content_id, {'error': 'Content not found'})
     
     async def get_upload_history(self) -> List[Dict[str, Any]]:
         """Get upload history"""
-        return self.upload_history
+        return list(self.upload_history)
     
     async def cleanup(self):
         """Cleanup resources"""
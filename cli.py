@@ -8,90 +8,132 @@ import asyncio
 import argparse
 import logging
 import sys
-from pathlib import Path
+from functools import cached_property
 from typing import Optional
 
-# Add project root to path
-sys.path.append(str(Path(__file__).parent))
-
 from config.settings import settings
-from agents.content_agent import ContentAgent
-from agents.video_agent import VideoAgent
-from agents.audio_agent import AudioAgent
-from agents.upload_agent import UploadAgent
-from utils.scheduler import ContentScheduler
-from utils.database import DatabaseManager
 from utils.logger import setup_logging, get_logger
 
 class ShortGeneratorCLI:
     """Command line interface for the video generation system"""
     
+    # Components in initialization order
+    COMPONENTS = ('db', 'content_agent', 'video_agent', 'audio_agent', 'upload_agent', 'scheduler')
+    
     def __init__(self):
         self.logger = get_logger(__name__)
         self.settings = settings
         
-        # Initialize components
-        self.db = DatabaseManager()
-        self.content_agent = ContentAgent()
-        self.video_agent = VideoAgent()
-        self.audio_agent = AudioAgent()
-        self.upload_agent = UploadAgent()
-        self.scheduler = ContentScheduler()
+        # The models run one video at a time; other stages of the next idea can overlap
+        self._video_lock = asyncio.Lock()
         
         # Initialize state
-        self.initialized = False
+        self.initialized = set()
+    
+    # Components are created on first use, so each command only imports what it needs
+    @cached_property
+    def db(self):
+        """Database manager"""
+        from utils.database import DatabaseManager
+        return DatabaseManager()
+    
+    @cached_property
+    def content_agent(self):
+        """Content idea agent"""
+        from agents.content_agent import ContentAgent
+        return ContentAgent()
+    
+    @cached_property
+    def video_agent(self):
+        """Video generation agent"""
+        from agents.video_agent import VideoAgent
+        return VideoAgent()
+    
+    @cached_property
+    def audio_agent(self):
+        """Audio agent"""
+        from agents.audio_agent import AudioAgent
+        return AudioAgent()
     
-    async def initialize(self):
-        """Initialize all system components"""
-        if self.initialized:
+    @cached_property
+    def upload_agent(self):
+        """Social media upload agent"""
+        from agents.upload_agent import UploadAgent
+        return UploadAgent()
+    
+    @cached_property
+    def scheduler(self):
+        """Content scheduler"""
+        from utils.scheduler import ContentScheduler
+        return ContentScheduler(self.db)
+    
+    async def initialize(self, *components: str):
+        """Initialize the given system components, or all of them"""
+        requested = components or self.COMPONENTS
+        pending = [name for name in self.COMPONENTS if name in requested and name not in self.initialized]
+        if not pending:
             return
             
         try:
             self.logger.info("▶️ Initializing system components...")
             
-            # Setup database
-            await self.db.initialize()
-            
-            # Initialize agents
-            await self.content_agent.initialize()
-            await self.video_agent.initialize()
-            await self.audio_agent.initialize()
-            await self.upload_agent.initialize()
+            # The database comes up first; the other components are independent of each other
+            if 'db' in pending:
+                await self._initialize_component('db')
+                pending.remove('db')
+            await asyncio.gather(*(self._initialize_component(name) for name in pending))
             
-            # Setup scheduler
-            await self.scheduler.initialize()
-            
-            self.initialized = True
             self.logger.info("✅ System initialized successfully!")
             
         except Exception as e:
             self.logger.error(f"❌ Failed to initialize system: {e}")
             raise
     
+    async def _initialize_component(self, name: str):
+        """Initialize one component and remember it for cleanup"""
+        await getattr(self, name).initialize()
+        self.initialized.add(name)
+    
     async def generate_content(self, count: int = 3, theme: str = "cute_animals"):
         """Generate content using the content agent"""
         try:
-            await self.initialize()
+            await self.initialize('db', 'content_agent', 'video_agent', 'audio_agent', 'scheduler')
             
             self.logger.info(f"🎬 Generating {count} videos with theme: {theme}")
             
             # Generate content ideas
             ideas = await self.content_agent.generate_ideas(count=count, theme=theme)
             
-            for idea in ideas:
-                self.logger.info(f"📝 Processing: {idea['title']}")
-                
+            # Process ideas concurrently so one idea's audio and saving overlap the next idea's video
+            semaphore = asyncio.Semaphore(max(1, self.settings.generation_concurrency))
+            completed = await asyncio.gather(*(self._process_idea(idea, semaphore) for idea in ideas))
+            
+            self.logger.info(f"🎉 Successfully generated {sum(completed)} of {len(ideas)} videos!")
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error generating content: {e}")
+            raise
+    
+    async def _process_idea(self, idea: dict, semaphore: asyncio.Semaphore) -> bool:
+        """Turn one content idea into a finished, queued video; a failure is logged and skips only this idea"""
+        async with semaphore:
+            self.logger.info(f"📝 Processing: {idea['title']}")
+            
+            try:
                 # Generate video
-                video_path = await self.video_agent.generate_video(
-                    prompt=idea['description'],
-                    duration=self.settings.video_duration
-                )
+                async with self._video_lock:
+                    video_path = await self.video_agent.generate_video(
+                        prompt=idea['description'],
+                        duration=self.settings.video_duration,
+                        name=idea['id']
+                    )
                 
-                # Add audio
+                # Add audio; the idea's ID keeps its files apart from ideas in flight alongside it
                 final_video = await self.audio_agent.add_audio(
                     video_path=video_path,
                     script=idea['script'],
-                    music_style="upbeat_cute"
+                    music_style="upbeat_cute",
+                    name=idea['id']
                 )
                 
                 # Save to database
@@ -102,35 +144,40 @@ class ShortGeneratorCLI:
                 await self.scheduler.queue_content(idea)
                 
                 self.logger.info(f"✅ Completed: {idea['title']}")
-            
-            self.logger.info(f"🎉 Successfully generated {count} videos!")
-            
-        except Exception as e:
-            self.logger.error(f"❌ Error generating content: {e}")
-            raise
+                return True
+                
+            except Exception as e:
+                self.logger.error(f"❌ Error processing {idea['title']}: {e}")
+                return False
     
     async def list_content(self, limit: int = 20):
         """List all generated content"""
         try:
-            await self.initialize()
+            await self.initialize('db')
             
-            content = await self.db.get_all_content(limit=limit)
+            # Print rows as they are read instead of loading the whole list first
+            count = 0
+            async for item in self.db.iter_content(limit=limit):
+                if count == 0:
+                    print("-" * 80)
+                count += 1
+                
+                # Write each item in one piece instead of line by line
+                lines = [
+                    f"ID: {item['id']}",
+                    f"Title: {item['title']}",
+                    f"Category: {item.get('category', 'N/A')}",
+                    f"Created: {item.get('created_at', 'N/A')}"
+                ]
+                if item.get('video_path'):
+                    lines.append(f"Video: {item['video_path']}")
+                lines.append("-" * 40)
+                sys.stdout.write("\n".join(lines) + "\n")
             
-            if not content:
+            if count:
+                print(f"📋 Found {count} content items")
+            else:
                 print("📭 No content found")
-                return
-            
-            print(f"📋 Found {len(content)} content items:")
-            print("-" * 80)
-            
-            for item in content:
-                print(f"ID: {item['id']}")
-                print(f"Title: {item['title']}")
-                print(f"Category: {item.get('category', 'N/A')}")
-                print(f"Created: {item.get('created_at', 'N/A')}")
-                if item.get('video_path'):
-                    print(f"Video: {item['video_path']}")
-                print("-" * 40)
             
         except Exception as e:
             self.logger.error(f"❌ Error listing content: {e}")
@@ -139,7 +186,7 @@ class ShortGeneratorCLI:
     async def upload_content(self, content_id: Optional[str] = None):
         """Upload content to social media platforms"""
         try:
-            await self.initialize()
+            await self.initialize('db', 'upload_agent', 'scheduler')
             
             if content_id:
                 # Upload specific content
@@ -152,8 +199,7 @@ class ShortGeneratorCLI:
                 results = await self.upload_agent.upload_to_all_platforms(content)
                 
                 # Save results
-                for platform, result in results.items():
-                    await self.db.save_upload_result(content_id, platform, result)
+                await self.db.save_upload_results(content_id, results)
                 
                 self.logger.info(f"✅ Upload completed for: {content['title']}")
                 
@@ -167,20 +213,9 @@ class ShortGeneratorCLI:
                 
                 self.logger.info(f"📤 Uploading {len(queued_content)} queued items...")
                 
-                for content in queued_content:
-                    if await self.scheduler.should_upload(content):
-                        self.logger.info(f"📤 Uploading: {content['title']}")
-                        
-                        results = await self.upload_agent.upload_to_all_platforms(content)
-                        
-                        # Save results
-                        for platform, result in results.items():
-                            await self.db.save_upload_result(content['id'], platform, result)
-                        
-                        # Mark as uploaded
-                        await self.scheduler.mark_uploaded(content['id'])
-                        
-                        self.logger.info(f"✅ Uploaded: {content['title']}")
+                # Uploads are network-bound, so several items can be in flight at once
+                semaphore = asyncio.Semaphore(max(1, min(self.settings.upload_concurrency, len(queued_content))))
+                await asyncio.gather(*(self._upload_queued(content, semaphore) for content in queued_content))
                 
                 self.logger.info("🎉 Upload cycle completed!")
             
@@ -188,47 +223,72 @@ class ShortGeneratorCLI:
             self.logger.error(f"❌ Error uploading content: {e}")
             raise
     
+    async def _upload_queued(self, content: dict, semaphore: asyncio.Semaphore):
+        """Upload one queued item if it is due"""
+        async with semaphore:
+            if not await self.scheduler.should_upload(content):
+                return
+            
+            self.logger.info(f"📤 Uploading: {content['title']}")
+            
+            results = await self.upload_agent.upload_to_all_platforms(content)
+            
+            # Save results
+            await self.db.save_upload_results(content['id'], results)
+            
+            # Mark as uploaded
+            await self.scheduler.mark_uploaded(content['id'])
+            
+            self.logger.info(f"✅ Uploaded: {content['title']}")
+    
     async def show_status(self):
         """Show system status"""
         try:
             # Only initialize database and basic components, skip heavy AI models
-            await self.db.initialize()
+            await self.initialize('db')
             
-            # Get system status
-            queued_content = await self.scheduler.get_queued_content()
-            daily_stats = await self.scheduler.get_daily_stats()
-            platform_stats = await self.db.get_platform_stats()
+            # Get system status; the three reads are independent
+            queued_content, daily_stats, platform_stats = await asyncio.gather(
+                self.scheduler.get_queued_content(),
+                self.scheduler.get_daily_stats(),
+                self.db.get_platform_stats()
+            )
             
-            print("📊 System Status")
-            print("=" * 50)
-            print(f"Status: 🟢 Online")
-            print(f"Queue Size: {len(queued_content)}")
-            print(f"Daily Generated: {daily_stats.get('content_generated', 0)}")
-            print(f"Daily Uploaded: {daily_stats.get('content_uploaded', 0)}")
+            lines = [
+                "📊 System Status",
+                "=" * 50,
+                f"Status: 🟢 Online",
+                f"Queue Size: {len(queued_content)}",
+                f"Daily Generated: {daily_stats.get('content_generated', 0)}",
+                f"Daily Uploaded: {daily_stats.get('content_uploaded', 0)}"
+            ]
             
             if daily_stats.get('next_upload'):
-                print(f"Next Upload: {daily_stats['next_upload']}")
+                lines.append(f"Next Upload: {daily_stats['next_upload']}")
             
-            print("\n📈 Platform Statistics")
-            print("-" * 30)
+            lines.append("\n📈 Platform Statistics")
+            lines.append("-" * 30)
             for platform, stats in platform_stats.items():
-                print(f"{platform.title()}:")
-                print(f"  Total: {stats['total_uploads']}")
-                print(f"  Success: {stats['successful_uploads']}")
-                print(f"  Rate: {stats['success_rate']:.1f}%")
+                lines.append(f"{platform.title()}:")
+                lines.append(f"  Total: {stats['total_uploads']}")
+                lines.append(f"  Success: {stats['successful_uploads']}")
+                lines.append(f"  Rate: {stats['success_rate']:.1f}%")
+            
+            lines.append("\n🔧 Configuration")
+            lines.append("-" * 20)
+            lines.append(f"Daily Video Count: {self.settings.daily_video_count}")
+            lines.append(f"Video Duration: {self.settings.video_duration}s")
+            lines.append(f"Video Resolution: {self.settings.video_resolution}")
+            lines.append(f"Enabled Platforms: {', '.join(self.settings.get_platforms())}")
             
-            print("\n🔧 Configuration")
-            print("-" * 20)
-            print(f"Daily Video Count: {self.settings.daily_video_count}")
-            print(f"Video Duration: {self.settings.video_duration}s")
-            print(f"Video Resolution: {self.settings.video_resolution}")
-            print(f"Enabled Platforms: {', '.join(self.settings.get_platforms())}")
+            lines.append("\n🤖 AI Models Status")
+            lines.append("-" * 20)
+            lines.append(f"Stable Video Diffusion: ✅ Downloaded (./stable-video-diffusion/)")
+            lines.append(f"Stable Diffusion: ⏳ Not downloaded (will download on first use)")
+            lines.append(f"GPU Available: {'✅' if self.settings.use_gpu else '❌'}")
             
-            print("\n🤖 AI Models Status")
-            print("-" * 20)
-            print(f"Stable Video Diffusion: ✅ Downloaded (./stable-video-diffusion/)")
-            print(f"Stable Diffusion: ⏳ Not downloaded (will download on first use)")
-            print(f"GPU Available: {'✅' if self.settings.use_gpu else '❌'}")
+            # One write, so the report comes out in a single piece
+            sys.stdout.write("\n".join(lines) + "\n")
             
         except Exception as e:
             self.logger.error(f"❌ Error getting status: {e}")
@@ -238,19 +298,31 @@ class ShortGeneratorCLI:
         """Cleanup system resources"""
         try:
             if self.initialized:
-                await self.content_agent.cleanup()
-                await self.video_agent.cleanup()
-                await self.audio_agent.cleanup()
-                await self.upload_agent.cleanup()
-                await self.db.cleanup()
-                await self.scheduler.cleanup()
+                # Clean up everything but the database together, so no component writes to a closed connection
+                names = [name for name in self.COMPONENTS if name in self.initialized and name != 'db']
+                results = await asyncio.gather(*(getattr(self, name).cleanup() for name in names),
+                                               return_exceptions=True)
+                for name, result in zip(names, results):
+                    if isinstance(result, Exception):
+                        self.logger.error(f"❌ Error cleaning up {name}: {result}")
                 
-                self.initialized = False
+                if 'db' in self.initialized:
+                    await self.db.cleanup()
+                
+                self.initialized.clear()
                 self.logger.info("🧹 System cleaned up")
                 
         except Exception as e:
             self.logger.error(f"❌ Error during cleanup: {e}")
 
+# Subcommand name -> coroutine that runs it
+COMMANDS = {
+    'generate': lambda cli, args: cli.generate_content(args.count, args.theme),
+    'list': lambda cli, args: cli.list_content(args.limit),
+    'upload': lambda cli, args: cli.upload_content(args.content_id),
+    'status': lambda cli, args: cli.show_status(),
+}
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -297,14 +369,7 @@ Examples:
         cli = ShortGeneratorCLI()
         
         try:
-            if args.command == 'generate':
-                await cli.generate_content(args.count, args.theme)
-            elif args.command == 'list':
-                await cli.list_content(args.limit)
-            elif args.command == 'upload':
-                await cli.upload_content(args.content_id)
-            elif args.command == 'status':
-                await cli.show_status()
+            await COMMANDS[args.command](cli, args)
             
         except Exception as e:
             logger.error(f"❌ Command failed: {e}")
@@ -312,8 +377,12 @@ Examples:
         finally:
             await cli.cleanup()
     
-    # Run the command
-    asyncio.run(run_command())
+    # Run the command, on uvloop's faster event loop when it is installed
+    try:
+        from uvloop import run
+    except ImportError:
+        run = asyncio.run
+    run(run_command())
 
 if __name__ == "__main__":
     main()
@@ -2,6 +2,7 @@
 Configuration settings for the Short Video Generator system.
 """
 import os
+from functools import cached_property
 from typing import Optional, List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
@@ -50,6 +51,11 @@ class Settings(BaseSettings):
     sd_model: str = Field(default="runwayml/stable-diffusion-v1-5", description="Stable Diffusion model")
     stable_diffusion_model: str = Field(default="runwayml/stable-diffusion-v1-5", description="Stable Diffusion model")
     video_model: str = Field(default="stabilityai/stable-video-diffusion-img2vid-xt", description="Stable Video Diffusion model")
+    sd_batch_size: int = Field(default=4, description="Keyframes generated per Stable Diffusion pipeline call")
+    compile_unet: bool = Field(default=False, description="torch.compile the Stable Diffusion UNet on GPU (slow first run)")
+    sd_cpu_offload: bool = Field(default=False, description="Keep idle diffusion weights in host RAM and move them to the GPU per forward pass")
+    sd_tiny_vae: bool = Field(default=False, description="Decode Stable Diffusion keyframes with the tiny TAESD autoencoder")
+    use_onnx_runtime: bool = Field(default=False, description="Run Stable Diffusion on ONNX Runtime (requires optimum[onnxruntime-gpu])")
     
     # Content generation settings
     daily_video_count: int = Field(default=3, description="Number of videos to generate per day")
@@ -57,6 +63,7 @@ class Settings(BaseSettings):
     video_resolution: str = Field(default="1080x1920", description="Video resolution")
     video_fps: int = Field(default=30, description="Video FPS")
     max_video_length: int = Field(default=60, description="Maximum video length in seconds")
+    generation_concurrency: int = Field(default=2, description="Content ideas processed at once (video generation still runs one at a time)")
     content_themes: str = Field(default="cute_animals,funny_pets,heartwarming_stories,educational_facts,seasonal_content", description="Content themes")
     
     # Video processing settings
@@ -67,6 +74,8 @@ class Settings(BaseSettings):
     
     # Audio settings
     audio_sample_rate: int = Field(default=44100, description="Audio sample rate")
+    audio_seed: Optional[int] = Field(default=None, description="Random seed for generated music (unset = random)")
+    generate_samples_on_init: bool = Field(default=False, description="Render sample music for every style when the audio agent starts")
     
     # Social media settings
     youtube_api_key: Optional[str] = Field(default=None, description="YouTube API key")
@@ -90,6 +99,8 @@ class Settings(BaseSettings):
     # Rate limiting
     max_requests_per_hour: int = Field(default=100, description="Maximum requests per hour")
     request_delay: float = Field(default=1.0, description="Delay between requests in seconds")
+    upload_concurrency: int = Field(default=4, description="Queued items uploaded at once")
+    upload_chunk_size: int = Field(default=4 * 1024 * 1024, description="Resumable upload chunk size in bytes (multiple of 256 KB)")
     
     # Storage settings
     max_file_size: int = Field(default=100 * 1024 * 1024, description="Maximum file size in bytes")
@@ -103,8 +114,8 @@ class Settings(BaseSettings):
     backup_interval_hours: int = Field(default=24, description="Backup interval in hours")
     max_backup_files: int = Field(default=7, description="Maximum backup files to keep")
     
-    # Computed properties
-    @property
+    # Computed properties (credentials are read once at startup, so these are cached)
+    @cached_property
     def is_youtube_enabled(self) -> bool:
         """Check if YouTube integration is enabled"""
         return all([
@@ -113,7 +124,7 @@ class Settings(BaseSettings):
             self.youtube_client_secret
         ])
     
-    @property
+    @cached_property
     def is_instagram_enabled(self) -> bool:
         """Check if Instagram integration is enabled"""
         return all([
@@ -121,7 +132,7 @@ class Settings(BaseSettings):
             self.instagram_password
         ])
     
-    @property
+    @cached_property
     def is_tiktok_enabled(self) -> bool:
         """Check if TikTok integration is enabled"""
         return all([
@@ -130,8 +141,9 @@ class Settings(BaseSettings):
             self.tiktok_client_secret
         ])
     
-    def get_platforms(self) -> List[str]:
-        """Get list of enabled social media platforms"""
+    @cached_property
+    def _enabled_platforms(self) -> tuple:
+        """Names of the enabled social media platforms"""
         platforms = []
         if self.is_youtube_enabled:
             platforms.append("YouTube")
@@ -139,7 +151,11 @@ class Settings(BaseSettings):
             platforms.append("Instagram")
         if self.is_tiktok_enabled:
             platforms.append("TikTok")
-        return platforms
+        return tuple(platforms)
+    
+    def get_platforms(self) -> List[str]:
+        """Get list of enabled social media platforms"""
+        return list(self._enabled_platforms)
 
 # Global settings instance
 settings = Settings()
@@ -6,11 +6,16 @@ Sets up the system, creates directories, and installs dependencies
 
 import os
 import sys
+import platform
 import subprocess
 import shutil
 from pathlib import Path
+from typing import Optional
 import json
 
+# Probe results from earlier runs, so repeat installs skip the slow checks
+PROBE_CACHE_FILE = Path(".install_cache.json")
+
 def print_banner():
     """Print installation banner"""
     print("=" * 60)
@@ -27,6 +32,45 @@ def check_python_version():
     
     print(f"✅ Python {sys.version_info.major}.{sys.version_info.minor} detected")
 
+def cached_probe(name: str, probe):
+    """Run a system probe, reusing a positive result from an earlier run on this machine and Python"""
+    key = f"{platform.node()}|{sys.executable}|{sys.version_info.major}.{sys.version_info.minor}"
+    
+    cache = {}
+    if PROBE_CACHE_FILE.exists():
+        try:
+            cache = json.loads(PROBE_CACHE_FILE.read_text())
+        except ValueError:
+            cache = {}
+    
+    results = cache.setdefault(key, {})
+    if results.get(name) and "--force" not in sys.argv:
+        return results[name]
+    
+    # Only positive results are kept, so anything missing is looked for again next time
+    result = probe()
+    if result:
+        results[name] = result
+        PROBE_CACHE_FILE.write_text(json.dumps(cache, indent=2))
+    return result
+
+def _pip_available() -> bool:
+    """Check that pip runs for this interpreter"""
+    try:
+        subprocess.run([sys.executable, "-m", "pip", "--version"], 
+                      check=True, capture_output=True)
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+def _cuda_available():
+    """Check for CUDA through PyTorch; None when PyTorch isn't installed"""
+    try:
+        import torch
+    except ImportError:
+        return None
+    return torch.cuda.is_available()
+
 def create_directories():
     """Create necessary directories"""
     print("📁 Creating directories...")
@@ -46,12 +90,22 @@ def create_directories():
         "web/templates"
     ]
     
-    for directory in directories:
+    # Creating the deepest directories also creates their parents
+    leaves = [d for d in directories if not any(other.startswith(d + "/") for other in directories)]
+    for directory in leaves:
         Path(directory).mkdir(parents=True, exist_ok=True)
-        print(f"  ✅ Created: {directory}")
     
+    print("\n".join(f"  ✅ Created: {directory}" for directory in directories))
     print()
 
+def write_file_atomic(path: Path, content: str, mode: Optional[int] = None):
+    """Write a file through a temporary copy, so an interrupted install never leaves it half written"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(content)
+    if mode is not None:
+        tmp_path.chmod(mode)
+    os.replace(tmp_path, path)
+
 def create_env_file():
     """Create .env file from example"""
     env_example = Path("config.env.example")
@@ -99,8 +153,7 @@ WEB_PORT=8000
 WEB_SECRET_KEY=change-this-secret-key
 """
         
-        with open(env_file, 'w') as f:
-            f.write(basic_env)
+        write_file_atomic(env_file, basic_env)
         
         print("📄 Created basic .env file")
     
@@ -110,11 +163,8 @@ def install_dependencies():
     """Install Python dependencies"""
     print("📦 Installing Python dependencies...")
     
-    try:
-        # Check if pip is available
-        subprocess.run([sys.executable, "-m", "pip", "--version"], 
-                      check=True, capture_output=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    # Check if pip is available
+    if not cached_probe("pip", _pip_available):
         print("❌ pip not found. Please install pip first.")
         sys.exit(1)
     
@@ -143,14 +193,22 @@ def install_dependencies():
             "pydub"
         ]
         
-        for dep in basic_deps:
-            try:
-                subprocess.run([
-                    sys.executable, "-m", "pip", "install", dep
-                ], check=True)
-                print(f"  ✅ Installed: {dep}")
-            except subprocess.CalledProcessError:
-                print(f"  ⚠️  Failed to install: {dep}")
+        # A single pip run resolves everything together and pays pip's start-up once
+        try:
+            subprocess.run([
+                sys.executable, "-m", "pip", "install", *basic_deps
+            ], check=True)
+            print(f"  ✅ Installed: {', '.join(basic_deps)}")
+        except subprocess.CalledProcessError:
+            # Retry one at a time so a single failing package doesn't block the rest
+            for dep in basic_deps:
+                try:
+                    subprocess.run([
+                        sys.executable, "-m", "pip", "install", dep
+                    ], check=True)
+                    print(f"  ✅ Installed: {dep}")
+                except subprocess.CalledProcessError:
+                    print(f"  ⚠️  Failed to install: {dep}")
     
     print()
 
@@ -159,7 +217,7 @@ def check_system_requirements():
     print("🔍 Checking system requirements...")
     
     # Check for FFmpeg (required for video processing)
-    ffmpeg_available = shutil.which("ffmpeg") is not None
+    ffmpeg_available = cached_probe("ffmpeg", lambda: shutil.which("ffmpeg")) is not None
     if ffmpeg_available:
         print("✅ FFmpeg found")
     else:
@@ -167,15 +225,14 @@ def check_system_requirements():
         print("   FFmpeg is required for video processing")
         print("   Install from: https://ffmpeg.org/download.html")
     
-    # Check for CUDA (optional, for GPU acceleration)
-    try:
-        import torch
-        if torch.cuda.is_available():
-            print("✅ CUDA available for GPU acceleration")
-        else:
-            print("ℹ️  CUDA not available, will use CPU")
-    except ImportError:
+    # Check for CUDA (optional, for GPU acceleration); importing torch is slow, so the answer is cached
+    cuda_available = cached_probe("cuda", _cuda_available)
+    if cuda_available:
+        print("✅ CUDA available for GPU acceleration")
+    elif cuda_available is None:
         print("ℹ️  PyTorch not installed, GPU check skipped")
+    else:
+        print("ℹ️  CUDA not available, will use CPU")
     
     print()
 
@@ -196,8 +253,7 @@ from config.settings import settings
 # settings.video_duration = 20
 """
         
-        with open(config_file, 'w') as f:
-            f.write(basic_config)
+        write_file_atomic(config_file, basic_config)
         
         print("  ✅ Created: config.py")
     
@@ -212,10 +268,6 @@ Run this to verify your installation
 
 import asyncio
 import sys
-from pathlib import Path
-
-# Add project root to path
-sys.path.append(str(Path(__file__).parent))
 
 async def test_system():
     \"\"\"Test basic system functionality\"\"\"
@@ -246,11 +298,8 @@ if __name__ == "__main__":
     sys.exit(0 if success else 1)
 """
         
-        with open(test_file, 'w') as f:
-            f.write(basic_test)
-        
-        # Make executable
-        test_file.chmod(0o755)
+        # Make executable before it appears under its real name
+        write_file_atomic(test_file, basic_test, mode=0o755)
         
         print("  ✅ Created: test_system.py")
     
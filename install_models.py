@@ -4,34 +4,61 @@ AI Model Installation Script for Short Video Generator
 Downloads and sets up required AI models
 """
 
-import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def run_command(cmd, description):
-    """Run a command and return success status"""
-    print(f"🔄 Running: {description}")
-    print(f"Command: {cmd}")
+# (pipeline class name, model ID, description, download size)
+MODELS = [
+    ("StableDiffusionPipeline", "runwayml/stable-diffusion-v1-5", "Stable Diffusion", "~4GB"),
+    ("DiffusionPipeline", "stabilityai/stable-video-diffusion-img2vid-xt", "Stable Video Diffusion", "~6GB"),
+]
+
+def verify_model(torch, pipeline_cls, model_id: str, description: str) -> bool:
+    """Load a downloaded diffusers pipeline from the local cache once to verify it"""
+    print(f"🔄 Verifying {description}...")
     print("-" * 50)
     
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        # Use CPU if CUDA not available
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        print(f"Using device: {device}")
+        
+        # Everything was downloaded already, so never go back to the network here.
+        # Half precision on either device halves the memory the verification copy needs.
+        pipe = pipeline_cls.from_pretrained(
+            model_id,
+            torch_dtype=torch.float16 if device == "cuda" else torch.bfloat16,
+            local_files_only=True
+        )
+        
+        if device == "cuda":
+            # Keep idle weights in host RAM instead of filling the GPU just to check the files load
+            try:
+                pipe.enable_model_cpu_offload()
+            except Exception as e:
+                print(f"⚠️ CPU offload unavailable ({e}), loading onto the GPU")
+                pipe = pipe.to(device)
+        
+        try:
+            print(f"Model location: {pipe.config.name_or_path}")
+        except:
+            print(f"Model location: {model_id}")
+        
+        print(f"✅ {description} installation completed successfully!")
+        return True
         
-        if result.returncode == 0:
-            print(f"✅ {description} completed successfully!")
-            if result.stdout:
-                print("Output:", result.stdout.strip())
-            return True
-        else:
-            print(f"❌ {description} failed!")
-            if result.stderr:
-                print("Error:", result.stderr.strip())
-            return False
-            
     except Exception as e:
-        print(f"❌ Error running {description}: {e}")
+        print(f"❌ {description} installation failed!")
+        print("Error:", e)
         return False
+        
+    finally:
+        # Release the verification copy before the next model loads
+        pipe = None
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
 
 def main():
     """Main installation function"""
@@ -49,114 +76,39 @@ def main():
     except:
         print("⚠️ Could not check disk space")
     
-    # Install Stable Diffusion model for image generation
-    print("🖼️ Installing Stable Diffusion model for image generation...")
-    print("📥 This will download ~4GB of data...")
-    
-    sd_script = """
-import torch
-from diffusers import StableDiffusionPipeline
-import os
-
-print("Downloading Stable Diffusion model...")
-model_id = "runwayml/stable-diffusion-v1-5"
-
-# Use CPU if CUDA not available
-device = "cuda" if torch.cuda.is_available() else "cpu"
-print(f"Using device: {device}")
-
-print("🔄 Downloading model files (this may take several minutes)...")
-# Download and cache the model
-pipe = StableDiffusionPipeline.from_pretrained(
-    model_id,
-    torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-    device_map=device if device == "cuda" else None
-)
-
-if device == "cpu":
-    pipe = pipe.to(device)
-
-print("✅ Stable Diffusion model installed successfully!")
-try:
-    print(f"Model location: {pipe.config.name_or_path}")
-except:
-    print(f"Model location: {model_id}")
-"""
-    
-    with open("temp_sd_install.py", "w") as f:
-        f.write(sd_script)
-    
-    if run_command("python3 temp_sd_install.py", "Stable Diffusion installation"):
-        print("✅ Stable Diffusion model installed!")
-    else:
-        print("⚠️ Stable Diffusion installation failed, but continuing...")
-    
-    # Clean up temp file
+    # torch and diffusers are imported once and shared by both downloads
     try:
-        os.remove("temp_sd_install.py")
-    except:
-        pass
-    
-    # Install Stable Video Diffusion model
-    print("🎬 Installing Stable Video Diffusion model...")
-    print("📥 This will download ~6GB of data...")
-    
-    svd_script = """
-import torch
-from diffusers import DiffusionPipeline
-import os
-
-print("Downloading Stable Video Diffusion model...")
-model_id = "stabilityai/stable-video-diffusion-img2vid-xt"
-
-# Use CPU if CUDA not available
-device = "cuda" if torch.cuda.is_available() else "cpu"
-print(f"Using device: {device}")
-
-print("🔄 Downloading model files (this may take 10+ minutes)...")
-print("📊 Progress will be shown as files download...")
-
-# Download and cache the model
-pipe = DiffusionPipeline.from_pretrained(
-    model_id,
-    torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-    device_map=device if device == "cuda" else None
-)
-
-if device == "cpu":
-    pipe = pipe.to(device)
-
-print("✅ Stable Video Diffusion model installed successfully!")
-try:
-    print(f"Model location: {pipe.config.name_or_path}")
-except:
-    print(f"Model location: {model_id}")
-
-# Check the actual downloaded size
-model_path = pipe.config.name_or_path
-if os.path.exists(model_path):
-    import subprocess
-    try:
-        result = subprocess.run(f"du -sh {model_path}", shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"📁 Downloaded model size: {result.stdout.strip()}")
-    except:
-        pass
-"""
+        import torch
+        import diffusers
+    except ImportError as e:
+        print(f"❌ {e}")
+        print("Install the GPU dependencies first: pip install -e .[gpu]")
+        sys.exit(1)
     
-    with open("temp_svd_install.py", "w") as f:
-        f.write(svd_script)
+    # Download both models at once; each download also fetches its own files in parallel
+    for _, _, description, size in MODELS:
+        print(f"📥 Downloading {description} ({size} of data)...")
     
-    if run_command("python3 temp_svd_install.py", "Stable Video Diffusion installation"):
-        print("✅ Stable Video Diffusion model installed!")
-    else:
-        print("⚠️ Stable Video Diffusion installation failed, but continuing...")
+    with ThreadPoolExecutor(max_workers=len(MODELS)) as executor:
+        downloads = [
+            executor.submit(getattr(diffusers, class_name).download, model_id)
+            for class_name, model_id, _, _ in MODELS
+        ]
     
-    # Clean up temp file
-    try:
-        os.remove("temp_svd_install.py")
-    except:
-        pass
+    # Verify one model at a time, so only one is held in memory
+    for (class_name, model_id, description, _), download in zip(MODELS, downloads):
+        try:
+            download.result()
+            installed = verify_model(torch, getattr(diffusers, class_name), model_id, description)
+        except Exception as e:
+            print(f"❌ {description} download failed!")
+            print("Error:", e)
+            installed = False
+        
+        if installed:
+            print(f"✅ {description} model installed!")
+        else:
+            print(f"⚠️ {description} installation failed, but continuing...")
     
     print()
     print("🎉 AI Model Installation Complete!")
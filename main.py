@@ -7,37 +7,34 @@ Coordinates all agents, models, and platform integrations
 import asyncio
 import logging
 import os
-import sys
-from pathlib import Path
+from datetime import datetime
 from typing import List, Dict, Any
 
-# Add project root to path
-sys.path.append(str(Path(__file__).parent))
-
-from config.settings import Settings
-from agents.content_agent import ContentAgent
-from agents.video_agent import VideoAgent
-from agents.audio_agent import AudioAgent
-from agents.upload_agent import UploadAgent
-from utils.scheduler import ContentScheduler
-from utils.database import DatabaseManager
-from web.dashboard import start_dashboard
+from config.settings import settings
 from utils.logger import setup_logging
 
 class ShortVideoGenerator:
     """Main orchestrator for the video generation system"""
     
     def __init__(self):
-        self.settings = Settings()
+        self.settings = settings
         self.logger = logging.getLogger(__name__)
         
+        # Import components here so importing this module doesn't load the media and web stacks
+        from agents.content_agent import ContentAgent
+        from agents.video_agent import VideoAgent
+        from agents.audio_agent import AudioAgent
+        from agents.upload_agent import UploadAgent
+        from utils.scheduler import ContentScheduler
+        from utils.database import DatabaseManager
+        
         # Initialize components
         self.db = DatabaseManager()
         self.content_agent = ContentAgent()
         self.video_agent = VideoAgent()
         self.audio_agent = AudioAgent()
         self.upload_agent = UploadAgent()
-        self.scheduler = ContentScheduler()
+        self.scheduler = ContentScheduler(self.db)
         
         # State tracking
         self.is_running = False
@@ -48,17 +45,9 @@ class ShortVideoGenerator:
         try:
             self.logger.info("🚀 Initializing Short Video Generator...")
             
-            # Setup database
-            await self.db.initialize()
-            
-            # Initialize agents
-            await self.content_agent.initialize()
-            await self.video_agent.initialize()
-            await self.audio_agent.initialize()
-            await self.upload_agent.initialize()
-            
-            # Setup scheduler
-            await self.scheduler.initialize()
+            # The components load independent models and clients, so start them together
+            await self._run_all('initialize', self.db, self.content_agent, self.video_agent,
+                                self.audio_agent, self.upload_agent, self.scheduler)
             
             self.logger.info("✅ System initialized successfully!")
             
@@ -66,6 +55,16 @@ class ShortVideoGenerator:
             self.logger.error(f"❌ Failed to initialize system: {e}")
             raise
     
+    async def _run_all(self, method: str, *components):
+        """Call a lifecycle method on every component concurrently, raising if any of them failed"""
+        results = await asyncio.gather(*(getattr(component, method)() for component in components),
+                                       return_exceptions=True)
+        
+        failures = [f"{type(component).__name__}: {result}"
+                    for component, result in zip(components, results) if isinstance(result, Exception)]
+        if failures:
+            raise RuntimeError(f"{method} failed for " + "; ".join(failures))
+    
     async def generate_daily_content(self):
         """Generate the daily batch of videos"""
         try:
@@ -77,36 +76,87 @@ class ShortVideoGenerator:
                 theme="cute_animals"
             )
             
-            for idea in ideas:
-                self.logger.info(f"📝 Processing idea: {idea['title']}")
-                
-                # Generate video
+            # Pipeline the stages: while one idea gets its audio, the next one's video is already rendering.
+            # The bounded queues hold back the video stage so finished clips don't pile up.
+            video_queue = asyncio.Queue(maxsize=2)
+            audio_queue = asyncio.Queue(maxsize=2)
+            
+            await asyncio.gather(
+                self._video_stage(ideas, video_queue),
+                self._audio_stage(video_queue, audio_queue),
+                self._queue_stage(audio_queue)
+            )
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error in daily content generation: {e}")
+    
+    async def _video_stage(self, ideas: List[Dict[str, Any]], video_queue: asyncio.Queue):
+        """Generate a video for each idea and hand it to the audio stage"""
+        for idea in ideas:
+            self.logger.info(f"📝 Processing idea: {idea['title']}")
+            try:
+                # Named by the idea's ID so the next render never overwrites a video still being muxed
                 video_path = await self.video_agent.generate_video(
                     prompt=idea['description'],
-                    duration=self.settings.video_duration
+                    duration=self.settings.video_duration,
+                    name=idea['id']
                 )
-                
-                # Add audio
+            except Exception as e:
+                self.logger.error(f"❌ Video generation failed for {idea['title']}: {e}")
+                continue
+            
+            if video_path:
+                await video_queue.put((idea, video_path))
+        
+        await video_queue.put(None)
+    
+    async def _audio_stage(self, video_queue: asyncio.Queue, audio_queue: asyncio.Queue):
+        """Add audio to each generated video and hand it to the queue stage"""
+        while True:
+            item = await video_queue.get()
+            if item is None:
+                break
+            
+            idea, video_path = item
+            try:
                 final_video = await self.audio_agent.add_audio(
                     video_path=video_path,
                     script=idea['script'],
-                    music_style="upbeat_cute"
+                    music_style="upbeat_cute",
+                    name=idea['id']
                 )
-                
-                # Queue for upload
+            except Exception as e:
+                self.logger.error(f"❌ Adding audio failed for {idea['title']}: {e}")
+                continue
+            
+            if final_video:
+                await audio_queue.put((idea, final_video))
+        
+        await audio_queue.put(None)
+    
+    async def _queue_stage(self, audio_queue: asyncio.Queue):
+        """Queue each finished video for upload"""
+        while True:
+            item = await audio_queue.get()
+            if item is None:
+                break
+            
+            idea, final_video = item
+            try:
                 await self.scheduler.queue_content({
                     'id': idea['id'],
                     'title': idea['title'],
                     'description': idea['description'],
                     'video_path': final_video,
                     'platforms': ['youtube', 'instagram', 'tiktok'],
-                    'scheduled_time': idea['optimal_time']
+                    'scheduled_time': idea['optimal_time'],
+                    'created_at': idea.get('created_at') or datetime.now()
                 })
-                
-                self.logger.info(f"✅ Completed: {idea['title']}")
-                
-        except Exception as e:
-            self.logger.error(f"❌ Error in daily content generation: {e}")
+            except Exception as e:
+                self.logger.error(f"❌ Queueing failed for {idea['title']}: {e}")
+                continue
+            
+            self.logger.info(f"✅ Completed: {idea['title']}")
     
     async def run_upload_cycle(self):
         """Run the upload cycle for queued content"""
@@ -115,40 +165,61 @@ class ShortVideoGenerator:
             
             # Get queued content
             queued_content = await self.scheduler.get_queued_content()
+            completed = []
             
-            for content in queued_content:
-                if await self.scheduler.should_upload(content):
-                    self.logger.info(f"📤 Uploading: {content['title']}")
-                    
-                    # Upload to all platforms
-                    results = await self.upload_agent.upload_to_all_platforms(content)
-                    
-                    # Update database with results
-                    await self.db.update_upload_status(content['id'], results)
-                    
-                    # Mark as uploaded
-                    await self.scheduler.mark_uploaded(content['id'])
-                    
-                    self.logger.info(f"✅ Uploaded: {content['title']}")
+            try:
+                # Each item already uploads to every platform at once; the semaphore caps how many items are in flight
+                semaphore = asyncio.Semaphore(max(1, self.settings.upload_concurrency))
+                outcomes = await asyncio.gather(
+                    *(self._upload_queued(content, semaphore, completed) for content in queued_content),
+                    return_exceptions=True
+                )
+                
+                # Every upload has settled by now, so the results recorded below are complete
+                for content, outcome in zip(queued_content, outcomes):
+                    if isinstance(outcome, Exception):
+                        self.logger.error(f"❌ Upload failed for {content['title']}: {outcome}")
+            finally:
+                # Save results and mark as uploaded in one transaction, including uploads finished before an error
+                if completed:
+                    await self.scheduler.record_uploads(completed)
                     
         except Exception as e:
             self.logger.error(f"❌ Error in upload cycle: {e}")
     
+    async def _upload_queued(self, content: Dict[str, Any], semaphore: asyncio.Semaphore,
+                             completed: List[tuple]):
+        """Upload one queued item if it is due, collecting its results"""
+        async with semaphore:
+            if not await self.scheduler.should_upload(content):
+                return
+            
+            self.logger.info(f"📤 Uploading: {content['title']}")
+            
+            # Upload to all platforms
+            results = await self.upload_agent.upload_to_all_platforms(content)
+            completed.append((content['id'], results))
+            
+            self.logger.info(f"✅ Uploaded: {content['title']}")
+    
     async def run_main_loop(self):
         """Main application loop"""
         self.is_running = True
         
         while self.is_running:
             try:
-                # Check if it's time for daily generation
+                # Run upload cycle only when something in the queue is due
+                upload_due = await self.scheduler.next_upload_due()
+                if upload_due and upload_due <= datetime.now():
+                    await self.run_upload_cycle()
+                
+                # Check if it's time for daily generation, including a queue the uploads just drained
                 if await self.scheduler.should_generate_daily():
                     await self.generate_daily_content()
+                    await self.scheduler.mark_generated()
                 
-                # Run upload cycle
-                await self.run_upload_cycle()
-                
-                # Wait before next cycle
-                await asyncio.sleep(60)  # Check every minute
+                # Sleep until the next generation slot or upload instead of polling every minute
+                await asyncio.sleep(await self.scheduler.next_wakeup())
                 
             except KeyboardInterrupt:
                 self.logger.info("🛑 Shutdown requested...")
@@ -162,11 +233,12 @@ class ShortVideoGenerator:
         self.logger.info("🔄 Shutting down...")
         self.is_running = False
         
-        # Cleanup
-        await self.content_agent.cleanup()
-        await self.video_agent.cleanup()
-        await self.audio_agent.cleanup()
-        await self.upload_agent.cleanup()
+        # Cleanup; the database goes last so nothing writes to a closed connection
+        try:
+            await self._run_all('cleanup', self.content_agent, self.video_agent,
+                                self.audio_agent, self.upload_agent, self.scheduler)
+        except RuntimeError as e:
+            self.logger.error(f"❌ {e}")
         await self.db.cleanup()
         
         self.logger.info("👋 Goodbye!")
@@ -185,6 +257,7 @@ async def main():
         await generator.initialize()
         
         # Start web dashboard in background
+        from web.dashboard import start_dashboard
         dashboard_task = asyncio.create_task(start_dashboard())
         
         # Run main loop
@@ -197,6 +270,10 @@ async def main():
         # Cleanup
         await generator.shutdown()
 
+def run():
+    """Console script entry point"""
+    asyncio.run(main())
+
 if __name__ == "__main__":
     # Run the application
-    asyncio.run(main())
+    run()
@@ -4,10 +4,6 @@ Simple launcher for the web dashboard
 """
 import asyncio
 import sys
-from pathlib import Path
-
-# Add the current directory to Python path
-sys.path.insert(0, str(Path(__file__).parent))
 
 from web.dashboard import start_dashboard
 
@@ -29,7 +29,8 @@ setup(
         "Source": "https://github.com/yourusername/short-video-generator",
         "Documentation": "https://github.com/yourusername/short-video-generator#readme",
     },
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests", "tests.*"]),
+    py_modules=["main", "cli"],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -60,11 +61,17 @@ setup(
             "torchvision>=0.16.0",
             "diffusers>=0.24.0",
         ],
+        "onnx": [
+            "optimum[onnxruntime-gpu]>=1.14.0",
+        ],
+        "speedups": [
+            "uvloop>=0.18.0; sys_platform != 'win32'",
+        ],
     },
     entry_points={
         "console_scripts": [
             "short-generator=cli:main",
-            "short-video-generator=main:main",
+            "short-video-generator=main:run",
         ],
     },
     include_package_data=True,
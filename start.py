@@ -58,7 +58,7 @@ def start_dashboard():
     """Start only the web dashboard"""
     print("🌐 Starting web dashboard...")
     try:
-        subprocess.run([sys.executable, "web/dashboard.py"], check=True)
+        subprocess.run([sys.executable, "-m", "web.dashboard"], check=True)
     except KeyboardInterrupt:
         print("\n🛑 Dashboard stopped by user")
     except Exception as e:
@@ -204,7 +204,6 @@ async def fallback_generation():
     logger.info("🎨 Using fallback animation generation...")
     
     # Import and run our simple generator
-    sys.path.append(str(Path(__file__).parent))
     from simple_puppy_test import create_puppy_frames, save_as_gif, create_output_dirs
     
     videos_dir = create_output_dirs()
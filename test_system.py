@@ -9,9 +9,6 @@ import logging
 import sys
 from pathlib import Path
 
-# Add project root to path
-sys.path.append(str(Path(__file__).parent))
-
 from config.settings import settings
 from agents.content_agent import ContentAgent
 from agents.video_agent import VideoAgent
@@ -79,11 +76,11 @@ async def test_audio_agent():
         assert music_path, "Music path should not be empty"
         
         # Test voice placeholder
-        voice_path = await agent._create_voice_placeholder("Test script")
+        voice_path = await agent._create_voice_placeholder("Test script", "test")
         assert voice_path, "Voice path should not be empty"
         
         # Test audio combination
-        combined_path = await agent._combine_audio(music_path, voice_path)
+        combined_path = await agent._combine_audio(music_path, voice_path, "test")
         assert combined_path, "Combined audio path should not be empty"
         
         print("✅ Audio Agent: PASSED")
@@ -0,0 +1,58 @@
+"""
+Tests for the audio agent's music synthesis helpers
+"""
+
+import pytest
+import numpy as np
+
+from agents.audio_agent import AudioAgent
+
+class TestMusicMixing:
+    """Test mixing of the generated music layers"""
+    
+    def test_mix_keeps_longest_layer(self):
+        """Test that the mix is as long as the longest layer, including rhythm"""
+        agent = AudioAgent()
+        style_config = agent.music_styles["upbeat_cute"]
+        
+        melody = np.full(100, 0.1, dtype=np.float32)
+        harmony = np.full(50, 0.1, dtype=np.float32)
+        rhythm = np.full(200, 0.1, dtype=np.float32)
+        
+        mixed = agent._mix_music_layers(melody, harmony, rhythm, style_config)
+        
+        assert mixed.size == 200
+        assert mixed[0] == pytest.approx(0.3)
+        assert mixed[150] == pytest.approx(0.1)
+    
+    def test_mix_stays_float_until_export(self):
+        """Test that overlapping layers are not clipped before normalization"""
+        agent = AudioAgent()
+        style_config = agent.music_styles["upbeat_cute"]
+        loud = np.full(10, 0.9, dtype=np.float32)
+        
+        mixed = agent._mix_music_layers(loud, loud, loud, style_config)
+        
+        assert mixed.dtype == np.float32
+        assert np.allclose(mixed, 2.7)
+        assert np.abs(agent._normalize(mixed)).max() <= 1.0
+
+class TestSeededRendering:
+    """Test that AUDIO_SEED makes renders reproducible"""
+    
+    def test_render_is_independent_of_other_draws(self, monkeypatch):
+        """Test that a seeded render gets the same notes whatever else draws random numbers meanwhile"""
+        agent = AudioAgent()
+        monkeypatch.setattr(agent.settings, "audio_seed", 7)
+        style_config = agent.music_styles["upbeat_cute"]
+        
+        first = agent._generate_melody(style_config, 5, agent._render_rng("music", "upbeat_cute", 5))
+        
+        # Voice-over draws running alongside the music must not shift its notes
+        agent._render_rng("voice", "Hello there").uniform(size=100)
+        second = agent._generate_melody(style_config, 5, agent._render_rng("music", "upbeat_cute", 5))
+        
+        assert np.array_equal(first, second)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -5,10 +5,6 @@ Basic tests for the Short Video Generator system
 import pytest
 import asyncio
 from pathlib import Path
-import sys
-
-# Add project root to path
-sys.path.append(str(Path(__file__).parent.parent))
 
 from config.settings import Settings
 from utils.logger import setup_logging
@@ -24,8 +20,10 @@ class TestBasicFunctionality:
         assert isinstance(settings.daily_video_count, int)
         assert isinstance(settings.video_duration, int)
     
-    def test_logger_setup(self):
+    def test_logger_setup(self, tmp_path, monkeypatch):
         """Test that logger can be set up"""
+        # The log file goes under ./logs, so keep it out of the working tree
+        monkeypatch.chdir(tmp_path)
         setup_logging()
         # If no exception is raised, the test passes
         assert True
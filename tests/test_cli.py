@@ -0,0 +1,122 @@
+"""
+Tests for the CLI's content generation flow
+"""
+
+import pytest
+import asyncio
+
+from cli import ShortGeneratorCLI
+
+class StubVideoAgent:
+    """Video agent that names its output after the given name, like the real one"""
+    
+    def __init__(self):
+        self.names = []
+    
+    async def generate_video(self, prompt, duration, name=None):
+        self.names.append(name)
+        await asyncio.sleep(0.01)
+        return f"videos/{prompt[:30]}_{duration}s_{name}.mp4"
+
+class StubAudioAgent:
+    """Audio agent that yields while muxing, so concurrent ideas interleave"""
+    
+    def __init__(self):
+        self.names = []
+    
+    async def add_audio(self, video_path, script, music_style="upbeat_cute", name=None):
+        self.names.append(name)
+        await asyncio.sleep(0.01)
+        return video_path.replace("videos/", "videos/final_")
+
+class StubStore:
+    """Stands in for the database and the scheduler"""
+    
+    def __init__(self):
+        self.saved = []
+    
+    async def save_content(self, content):
+        self.saved.append(dict(content))
+    
+    async def queue_content(self, content):
+        pass
+
+class TestProcessIdea:
+    """Test processing several ideas at once"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_ideas_get_distinct_files(self):
+        """Test that ideas with the same description prefix don't share output files"""
+        cli = ShortGeneratorCLI()
+        cli.video_agent = StubVideoAgent()
+        cli.audio_agent = StubAudioAgent()
+        cli.db = cli.scheduler = StubStore()
+        
+        ideas = [
+            {'id': f"idea_20250101_060000_{i}", 'title': f"Idea {i}",
+             'description': "A delightful video featuring puppies", 'script': "Hello"}
+            for i in range(2)
+        ]
+        
+        semaphore = asyncio.Semaphore(2)
+        await asyncio.gather(*(cli._process_idea(idea, semaphore) for idea in ideas))
+        
+        assert sorted(cli.video_agent.names) == [idea['id'] for idea in ideas]
+        assert sorted(cli.audio_agent.names) == [idea['id'] for idea in ideas]
+        assert len({content['video_path'] for content in cli.db.saved}) == 2
+    
+    @pytest.mark.asyncio
+    async def test_failed_idea_does_not_stop_the_others(self):
+        """Test that one idea's error is logged and the other ideas still finish"""
+        cli = ShortGeneratorCLI()
+        cli.video_agent = StubVideoAgent()
+        cli.audio_agent = StubAudioAgent()
+        cli.db = cli.scheduler = StubStore()
+        
+        ideas = [
+            {'id': f"idea_{i}", 'title': f"Idea {i}", 'description': "Puppies", 'script': "Hello"}
+            for i in range(3)
+        ]
+        del ideas[1]['script']
+        
+        semaphore = asyncio.Semaphore(2)
+        completed = await asyncio.gather(*(cli._process_idea(idea, semaphore) for idea in ideas))
+        
+        assert completed == [True, False, True]
+        assert sorted(content['id'] for content in cli.db.saved) == ["idea_0", "idea_2"]
+
+class StubComponent:
+    """Component that records when its cleanup ran"""
+    
+    def __init__(self, name, events, fail=False):
+        self.name = name
+        self.events = events
+        self.fail = fail
+    
+    async def cleanup(self):
+        await asyncio.sleep(0.01)
+        self.events.append(self.name)
+        if self.fail:
+            raise RuntimeError("cleanup failed")
+
+class TestCleanup:
+    """Test shutting the CLI's components down"""
+    
+    @pytest.mark.asyncio
+    async def test_database_closes_last_despite_failures(self):
+        """Test that a failing cleanup doesn't skip the others and the database closes after them"""
+        cli = ShortGeneratorCLI()
+        events = []
+        cli.db = StubComponent('db', events)
+        cli.video_agent = StubComponent('video_agent', events, fail=True)
+        cli.scheduler = StubComponent('scheduler', events)
+        cli.initialized = {'db', 'video_agent', 'scheduler'}
+        
+        await cli.cleanup()
+        
+        assert sorted(events[:2]) == ['scheduler', 'video_agent']
+        assert events[2] == 'db'
+        assert not cli.initialized
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
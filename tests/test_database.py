@@ -0,0 +1,89 @@
+"""
+Tests for the database manager's upload queue
+"""
+
+import pytest
+from datetime import date, datetime
+
+from utils.database import DatabaseManager
+
+@pytest.fixture
+async def db(tmp_path):
+    """Database manager backed by a file in a temporary directory"""
+    manager = DatabaseManager()
+    manager.db_path = tmp_path / "test.db"
+    await manager.initialize()
+    yield manager
+    await manager.cleanup()
+
+class TestUploadRecording:
+    """Test recording the results of an upload cycle"""
+    
+    @pytest.mark.asyncio
+    async def test_mixed_batch_is_recorded(self, db):
+        """Test that an item whose upload failed outright doesn't undo the rest of the batch"""
+        for content_id in ("a", "b"):
+            await db.queue_content({'id': content_id, 'title': content_id})
+        
+        recorded = await db.record_uploads([
+            ("a", {'youtube': {'success': True}}),
+            ("b", {'error': "boom"})
+        ])
+        
+        assert recorded
+        assert await db.get_queued_content() == []
+        
+        rows = db.connection.execute(
+            "SELECT content_id, platform, status FROM uploads ORDER BY content_id"
+        ).fetchall()
+        assert [tuple(row) for row in rows] == [("a", "youtube", "success"), ("b", "error", "failed")]
+
+class TestUploadQueue:
+    """Test the persistent upload queue"""
+    
+    @pytest.mark.asyncio
+    async def test_queueing_again_replaces_the_entry(self, db):
+        """Test that queueing the same ID twice keeps one, updated entry"""
+        await db.queue_content({'id': "a", 'title': "First"})
+        await db.queue_content({'id': "a", 'title': "Second"})
+        
+        queued = await db.get_queued_content()
+        assert [content['title'] for content in queued] == ["Second"]
+    
+    @pytest.mark.asyncio
+    async def test_scheduled_items_come_first_then_oldest(self, db):
+        """Test that the queue is ordered by scheduled time, then creation time, with unset times last"""
+        await db.queue_content({'id': "unscheduled_new", 'created_at': datetime(2025, 1, 2)})
+        await db.queue_content({'id': "no_times"})
+        await db.queue_content({'id': "scheduled_late", 'scheduled_time': datetime(2025, 1, 3, 12)})
+        await db.queue_content({'id': "unscheduled_old", 'created_at': datetime(2025, 1, 1)})
+        await db.queue_content({'id': "scheduled_early", 'scheduled_time': datetime(2025, 1, 3, 9)})
+        
+        queued = await db.get_queued_content()
+        assert [content['id'] for content in queued] == [
+            "scheduled_early", "scheduled_late", "unscheduled_old", "unscheduled_new", "no_times"
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_marked_content_leaves_the_queue(self, db):
+        """Test that uploaded content is no longer queued"""
+        await db.queue_content({'id': "a"})
+        await db.queue_content({'id': "b"})
+        
+        assert await db.mark_uploaded("a")
+        assert [content['id'] for content in await db.get_queued_content()] == ["b"]
+    
+    @pytest.mark.asyncio
+    async def test_queue_stats_count_one_day(self, db):
+        """Test that generated and uploaded counts cover only the given day, and pending covers all"""
+        today = date.today()
+        await db.queue_content({'id': "today", 'created_at': datetime.now()})
+        await db.queue_content({'id': "today_uploaded", 'created_at': datetime.now()})
+        await db.queue_content({'id': "last_year", 'created_at': datetime(today.year - 1, 1, 1)})
+        await db.mark_uploaded("today_uploaded")
+        
+        assert await db.get_queue_stats(today) == {'generated': 2, 'uploaded': 1, 'pending': 2}
+        assert await db.get_queue_stats(date(today.year - 1, 1, 1)) == {'generated': 1, 'uploaded': 0, 'pending': 2}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
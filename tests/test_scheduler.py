@@ -0,0 +1,86 @@
+"""
+Tests for the scheduler's timing decisions
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+import utils.scheduler
+from utils.database import DatabaseManager
+from utils.scheduler import ContentScheduler
+
+@pytest.fixture
+async def scheduler(tmp_path):
+    """Scheduler over a database in a temporary directory, with the default 06:00 generation time"""
+    db = DatabaseManager()
+    db.db_path = tmp_path / "test.db"
+    await db.initialize()
+    yield ContentScheduler(db)
+    await db.cleanup()
+
+def pin_now(monkeypatch, now: datetime):
+    """Make the scheduler see a fixed current time"""
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+    
+    monkeypatch.setattr(utils.scheduler, "datetime", FixedDatetime)
+
+class TestGenerationSlot:
+    """Test when daily generation becomes due"""
+    
+    @pytest.mark.asyncio
+    async def test_latest_slot_around_generation_time(self, scheduler):
+        """Test that the slot moves to today exactly at 06:00"""
+        assert scheduler._latest_generation_slot(datetime(2025, 1, 2, 5, 59)) == datetime(2025, 1, 1, 6, 0)
+        assert scheduler._latest_generation_slot(datetime(2025, 1, 2, 6, 0)) == datetime(2025, 1, 2, 6, 0)
+        assert scheduler._latest_generation_slot(datetime(2025, 1, 2, 6, 1)) == datetime(2025, 1, 2, 6, 0)
+    
+    @pytest.mark.asyncio
+    async def test_generation_due_once_the_slot_passes(self, scheduler, monkeypatch):
+        """Test that a batch made before 06:00 is followed by another just after it"""
+        monkeypatch.setattr(scheduler.settings, "daily_video_count", 0)
+        scheduler.last_generation = datetime(2025, 1, 2, 0, 30)
+        
+        pin_now(monkeypatch, datetime(2025, 1, 2, 5, 59))
+        assert not await scheduler.should_generate_daily()
+        
+        pin_now(monkeypatch, datetime(2025, 1, 2, 6, 1))
+        assert await scheduler.should_generate_daily()
+
+class TestWakeup:
+    """Test how long the main loop sleeps"""
+    
+    @pytest.mark.asyncio
+    async def test_wakes_at_the_next_slot(self, scheduler, monkeypatch):
+        """Test that an idle scheduler sleeps until 06:00, within the delay limits"""
+        pin_now(monkeypatch, datetime(2025, 1, 2, 5, 58))
+        assert await scheduler.next_wakeup() == 120
+        
+        pin_now(monkeypatch, datetime(2025, 1, 2, 5, 0))
+        assert await scheduler.next_wakeup() == 300
+        assert await scheduler.next_wakeup(max_delay=7200) == 3600
+        
+        pin_now(monkeypatch, datetime(2025, 1, 2, 5, 59, 58))
+        assert await scheduler.next_wakeup() == 5
+    
+    @pytest.mark.asyncio
+    async def test_overdue_upload_retries_after_min_delay(self, scheduler, monkeypatch):
+        """Test that an overdue queued item wakes the loop after min_delay"""
+        pin_now(monkeypatch, datetime(2025, 1, 2, 12, 0))
+        await scheduler.db.queue_content({'id': "a", 'scheduled_time': datetime(2025, 1, 2, 11, 0)})
+        
+        assert await scheduler.next_upload_due() == datetime(2025, 1, 2, 11, 0)
+        assert await scheduler.next_wakeup(min_delay=5) == 5
+    
+    @pytest.mark.asyncio
+    async def test_wakes_for_the_next_upload(self, scheduler, monkeypatch):
+        """Test that a queued item due before the next slot sets the wakeup"""
+        pin_now(monkeypatch, datetime(2025, 1, 2, 12, 0))
+        await scheduler.db.queue_content({'id': "a", 'scheduled_time': datetime(2025, 1, 2, 12, 1)})
+        
+        assert await scheduler.next_wakeup() == 60
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
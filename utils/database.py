@@ -6,12 +6,31 @@ Handles data persistence for content and uploads
 import logging
 import sqlite3
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from datetime import date, datetime
 import json
 
 from config.settings import settings
 
+def _isoformat(value: Any) -> str:
+    """Render a datetime as an ISO 8601 string, and anything else with str()"""
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+def _upload_rows(content_id: str, results: Dict[str, Any], uploaded_at: str) -> List[tuple]:
+    """Build uploads rows for one item; a result that isn't a dict (such as an error string) is a failed row"""
+    rows = []
+    for platform, result in results.items():
+        if not isinstance(result, dict):
+            result = {'success': False, 'error': result}
+        rows.append((
+            content_id,
+            platform,
+            'success' if result.get('success') else 'failed',
+            json.dumps(result, default=str),
+            uploaded_at
+        ))
+    return rows
+
 class DatabaseManager:
     """Manages database operations"""
     
@@ -63,6 +82,11 @@ class DatabaseManager:
                 )
             """)
             
+            # Content is listed newest first
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_content_created_at ON content (created_at)
+            """)
+            
             # Uploads table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS uploads (
@@ -76,6 +100,23 @@ class DatabaseManager:
                 )
             """)
             
+            # Upload queue, shared by every process that uses the scheduler
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS upload_queue (
+                    content_id TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    scheduled_time TEXT,
+                    created_at TEXT,
+                    queued_at TEXT,
+                    uploaded_at TEXT
+                )
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_upload_queue_pending
+                ON upload_queue (uploaded_at, scheduled_time, created_at)
+            """)
+            
             # Settings table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS settings (
@@ -146,28 +187,31 @@ class DatabaseManager:
     async def get_all_content(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get all content with limit"""
         try:
-            cursor = self.connection.cursor()
+            return [content async for content in self.iter_content(limit)]
             
+        except Exception as e:
+            self.logger.error(f"❌ Error getting all content: {e}")
+            return []
+    
+    async def iter_content(self, limit: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """Yield content one row at a time, newest first"""
+        cursor = self.connection.cursor()
+        
+        try:
             cursor.execute("""
                 SELECT * FROM content 
                 ORDER BY created_at DESC 
                 LIMIT ?
             """, (limit,))
             
-            rows = cursor.fetchall()
-            content_list = []
-            
-            for row in rows:
+            for row in cursor:
                 content = dict(row)
                 if content.get('tags'):
                     content['tags'] = json.loads(content['tags'])
-                content_list.append(content)
-            
-            return content_list
-            
-        except Exception as e:
-            self.logger.error(f"❌ Error getting all content: {e}")
-            return []
+                yield content
+                
+        finally:
+            cursor.close()
     
     async def save_upload_result(self, content_id: str, platform: str, result: Dict[str, Any]) -> bool:
         """Save upload result"""
@@ -192,6 +236,23 @@ class DatabaseManager:
             self.logger.error(f"❌ Error saving upload result: {e}")
             return False
     
+    async def save_upload_results(self, content_id: str, results: Dict[str, Dict[str, Any]]) -> bool:
+        """Save the upload results of every platform in one transaction"""
+        try:
+            uploaded_at = datetime.now().isoformat()
+            
+            with self.connection:
+                self.connection.executemany("""
+                    INSERT INTO uploads (content_id, platform, status, result, uploaded_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, _upload_rows(content_id, results, uploaded_at))
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error saving upload results: {e}")
+            return False
+    
     async def get_upload_history(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get upload history"""
         try:
@@ -250,6 +311,104 @@ class DatabaseManager:
             self.logger.error(f"❌ Error getting platform stats: {e}")
             return {}
     
+    async def queue_content(self, content: Dict[str, Any]) -> bool:
+        """Add content to the upload queue, replacing an earlier entry for the same ID"""
+        try:
+            with self.connection:
+                self.connection.execute("""
+                    INSERT OR REPLACE INTO upload_queue
+                    (content_id, content, scheduled_time, created_at, queued_at, uploaded_at)
+                    VALUES (?, ?, ?, ?, ?, NULL)
+                """, (
+                    content['id'],
+                    json.dumps(content, default=_isoformat),
+                    _isoformat(content['scheduled_time']) if content.get('scheduled_time') else None,
+                    _isoformat(content['created_at']) if content.get('created_at') else None,
+                    datetime.now().isoformat()
+                ))
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error queuing content: {e}")
+            return False
+    
+    async def get_queued_content(self) -> List[Dict[str, Any]]:
+        """Get content waiting for upload, scheduled items first, then oldest first"""
+        try:
+            cursor = self.connection.cursor()
+            
+            cursor.execute("""
+                SELECT content FROM upload_queue
+                WHERE uploaded_at IS NULL
+                ORDER BY scheduled_time IS NULL, scheduled_time, created_at IS NULL, created_at
+            """)
+            
+            return [json.loads(row['content']) for row in cursor.fetchall()]
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error getting queued content: {e}")
+            return []
+    
+    async def mark_uploaded(self, content_id: str) -> bool:
+        """Take content off the upload queue, keeping it for the daily statistics"""
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "UPDATE upload_queue SET uploaded_at = ? WHERE content_id = ?",
+                    (datetime.now().isoformat(), content_id)
+                )
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error marking content uploaded: {e}")
+            return False
+    
+    async def record_uploads(self, completed: List[Tuple[str, Dict[str, Dict[str, Any]]]]) -> bool:
+        """Save the upload results of several items and take them off the queue, all in one transaction"""
+        try:
+            uploaded_at = datetime.now().isoformat()
+            
+            with self.connection:
+                self.connection.executemany("""
+                    INSERT INTO uploads (content_id, platform, status, result, uploaded_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [
+                    row
+                    for content_id, results in completed
+                    for row in _upload_rows(content_id, results, uploaded_at)
+                ])
+                self.connection.executemany(
+                    "UPDATE upload_queue SET uploaded_at = ? WHERE content_id = ?",
+                    [(uploaded_at, content_id) for content_id, _ in completed]
+                )
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error recording uploads: {e}")
+            return False
+    
+    async def get_queue_stats(self, day: date) -> Dict[str, int]:
+        """Count content created and uploaded on a day, and content still waiting"""
+        try:
+            cursor = self.connection.cursor()
+            
+            cursor.execute("""
+                SELECT SUM(CASE WHEN substr(created_at, 1, 10) = :day THEN 1 ELSE 0 END) as generated,
+                       SUM(CASE WHEN substr(uploaded_at, 1, 10) = :day THEN 1 ELSE 0 END) as uploaded,
+                       SUM(CASE WHEN uploaded_at IS NULL THEN 1 ELSE 0 END) as pending
+                FROM upload_queue
+            """, {'day': day.isoformat()})
+            
+            row = cursor.fetchone()
+            return {key: row[key] or 0 for key in ('generated', 'uploaded', 'pending')}
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error getting queue stats: {e}")
+            return {'generated': 0, 'uploaded': 0, 'pending': 0}
+    
     async def save_setting(self, key: str, value: Any) -> bool:
         """Save application setting"""
         try:
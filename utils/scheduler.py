@@ -6,23 +6,27 @@ Manages content generation and upload timing
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import schedule
 import time
 
 from config.settings import settings
+from utils.database import DatabaseManager
 
 class ContentScheduler:
     """Manages content scheduling and timing"""
     
-    def __init__(self):
+    def __init__(self, db: Optional[DatabaseManager] = None):
         self.logger = logging.getLogger(__name__)
         self.settings = settings
         
+        # The upload queue lives in the database, so a later run can upload what an earlier one generated
+        self.db = db or DatabaseManager()
+        self._owns_db = db is None
+        
         # Scheduling state
         self.last_generation = None
         self.last_upload = None
-        self.content_queue = []
         self.upload_schedule = []
         
         # Daily schedule
@@ -34,6 +38,9 @@ class ContentScheduler:
         try:
             self.logger.info("⏰ Initializing Content Scheduler...")
             
+            if self._owns_db:
+                await self.db.initialize()
+            
             # Setup daily schedule
             schedule.every().day.at(self.daily_generation_time).do(self._mark_daily_generation_needed)
             
@@ -50,23 +57,37 @@ class ContentScheduler:
         """Check if daily content generation is needed"""
         now = datetime.now()
         
-        # Check if we haven't generated today
+        # Check if we haven't generated yet
         if not self.last_generation:
             return True
         
-        # Check if it's a new day
-        if self.last_generation.date() < now.date():
+        # Check if the daily generation time has come round since the last batch
+        if self.last_generation < self._latest_generation_slot(now):
             return True
         
         # Check if we need more content
-        if len(self.content_queue) < self.settings.daily_video_count:
+        queue_stats = await self.db.get_queue_stats(now.date())
+        if queue_stats['pending'] < self.settings.daily_video_count:
             return True
         
         return False
     
+    def _latest_generation_slot(self, now: datetime) -> datetime:
+        """Get the most recent daily generation time at or before now"""
+        hour, minute = (int(part) for part in self.daily_generation_time.split(':'))
+        slot = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if slot > now:
+            slot -= timedelta(days=1)
+        return slot
+    
     async def should_upload(self, content: Dict[str, Any]) -> bool:
         """Check if content should be uploaded now"""
-        now = datetime.now()
+        due_time = self._upload_due_time(content)
+        return due_time is not None and datetime.now() >= due_time
+    
+    def _upload_due_time(self, content: Dict[str, Any]) -> Optional[datetime]:
+        """Get the time content becomes due for upload: its scheduled time, or 2 hours after creation"""
+        due_times = []
         
         # Check if content is scheduled for upload
         scheduled_time = content.get('scheduled_time')
@@ -77,49 +98,62 @@ class ContentScheduler:
                 scheduled_time = None
         
         if scheduled_time:
-            # Check if it's time to upload
-            if now >= scheduled_time:
-                return True
+            due_times.append(scheduled_time)
         
-        # Check if content has been queued long enough
+        # Upload if content is older than 2 hours
         created_at = content.get('created_at')
         if created_at and isinstance(created_at, str):
             try:
-                created_at = datetime.fromisoformat(created_at)
-                # Upload if content is older than 2 hours
-                if now - created_at > timedelta(hours=2):
-                    return True
+                due_times.append(datetime.fromisoformat(created_at) + timedelta(hours=2))
             except:
                 pass
         
-        return False
+        return min(due_times) if due_times else None
+    
+    async def next_upload_due(self) -> Optional[datetime]:
+        """Get the earliest time any queued content becomes due for upload"""
+        due_times = [self._upload_due_time(content) for content in await self.db.get_queued_content()]
+        due_times = [due_time for due_time in due_times if due_time is not None]
+        return min(due_times) if due_times else None
+    
+    async def mark_generated(self):
+        """Record that the daily content has been generated"""
+        self.last_generation = datetime.now()
+    
+    async def next_wakeup(self, max_delay: float = 300, min_delay: float = 5) -> float:
+        """Get the seconds until the next daily generation or upload is due, within min_delay and max_delay"""
+        now = datetime.now()
+        
+        # Next daily generation slot, the same one should_generate_daily checks against.
+        # The pending-count check only changes after an upload cycle, which runs right before it.
+        next_event = self._latest_generation_slot(now) + timedelta(days=1)
+        
+        # Next queued upload; an overdue one is retried after min_delay
+        upload_due = await self.next_upload_due()
+        if upload_due:
+            next_event = min(next_event, upload_due)
+        
+        return min(max((next_event - now).total_seconds(), min_delay), max_delay)
     
     async def queue_content(self, content: Dict[str, Any]):
         """Add content to upload queue"""
         try:
-            # Add to queue
-            self.content_queue.append(content)
-            
-            # Sort by priority (scheduled time first, then creation time)
-            self.content_queue.sort(key=lambda x: (
-                x.get('scheduled_time', datetime.max),
-                x.get('created_at', datetime.max)
-            ))
-            
-            self.logger.info(f"📋 Queued content: {content['title']}")
+            # Add to queue, replacing an earlier entry for the same content
+            if await self.db.queue_content(content):
+                self.logger.info(f"📋 Queued content: {content['title']}")
             
         except Exception as e:
             self.logger.error(f"❌ Error queuing content: {e}")
     
     async def get_queued_content(self) -> List[Dict[str, Any]]:
-        """Get list of queued content"""
-        return self.content_queue.copy()
+        """Get list of queued content, by priority (scheduled time first, then creation time)"""
+        return await self.db.get_queued_content()
     
     async def mark_uploaded(self, content_id: str):
         """Mark content as uploaded and remove from queue"""
         try:
-            # Find and remove content from queue
-            self.content_queue = [c for c in self.content_queue if c['id'] != content_id]
+            # Remove content from queue
+            await self.db.mark_uploaded(content_id)
             
             # Update last upload time
             self.last_upload = datetime.now()
@@ -129,6 +163,16 @@ class ContentScheduler:
         except Exception as e:
             self.logger.error(f"❌ Error marking content uploaded: {e}")
     
+    async def record_uploads(self, completed: List[Tuple[str, Dict[str, Any]]]):
+        """Save the results of a batch of uploads and remove them from the queue"""
+        try:
+            if await self.db.record_uploads(completed):
+                self.last_upload = datetime.now()
+                self.logger.info(f"✅ Marked {len(completed)} items as uploaded")
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error recording uploads: {e}")
+    
     async def get_next_upload_time(self) -> Optional[datetime]:
         """Get next scheduled upload time"""
         now = datetime.now()
@@ -157,23 +201,14 @@ class ContentScheduler:
         """Get daily statistics"""
         now = datetime.now()
         
-        # Count content generated today
-        today_content = [
-            c for c in self.content_queue 
-            if c.get('created_at') and 
-            datetime.fromisoformat(c['created_at']).date() == now.date()
-        ]
-        
-        # Count content uploaded today
-        today_uploads = 0
-        if self.last_upload and self.last_upload.date() == now.date():
-            today_uploads = len([c for c in self.content_queue if c.get('uploaded_at')])
+        # Count content generated and uploaded today
+        queue_stats = await self.db.get_queue_stats(now.date())
         
         return {
             'date': now.date().isoformat(),
-            'content_generated': len(today_content),
-            'content_uploaded': today_uploads,
-            'queue_length': len(self.content_queue),
+            'content_generated': queue_stats['generated'],
+            'content_uploaded': queue_stats['uploaded'],
+            'queue_length': queue_stats['pending'],
             'next_upload': await self.get_next_upload_time()
         }
     
@@ -206,6 +241,9 @@ class ContentScheduler:
             # Clear all scheduled jobs
             schedule.clear()
             
+            if self._owns_db:
+                await self.db.cleanup()
+            
             self.logger.info("🧹 Content Scheduler cleaned up")
             
         except Exception as e:
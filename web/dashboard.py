@@ -3,14 +3,9 @@ Web Dashboard
 Provides a web interface for monitoring and controlling the video generation system
 """
 
-import sys
 import os
 from pathlib import Path
 
-# Add project root to Python path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
 import asyncio
 import logging
 from typing import Dict, Any, List
@@ -40,7 +35,7 @@ class WebDashboard:
         
         self.logger = logging.getLogger(__name__)
         self.db = DatabaseManager()
-        self.scheduler = ContentScheduler()
+        self.scheduler = ContentScheduler(self.db)
         
         # Setup middleware
         self._setup_middleware()